@@ -53,11 +53,9 @@ int main(int argc, char* argv[]) {
 
     std::cout << "C++ Master ready. Waiting for Python slave to connect...\n";
 
-    // Wait for slave
-    bool slave_alive = false;
-    while (running && !slave_alive) {
-        eshm_check_remote_alive(eshm, &slave_alive);
-        std::this_thread::sleep_for(std::chrono::milliseconds(100));
+    // Wait for slave (returns as soon as it attaches; the 100ms timeout
+    // only bounds how long Ctrl+C takes to be noticed)
+    while (running && eshm_wait_remote(eshm, 100) == ESHM_ERROR_TIMEOUT) {
     }
 
     if (!running) {
@@ -4,6 +4,7 @@
 #include "eshm_data.h"
 #include <stddef.h>
 #include <stdbool.h>
+#include <sys/uio.h>
 
 #ifdef __cplusplus
 extern "C" {
@@ -60,6 +61,29 @@ int eshm_destroy(ESHMHandle* handle);
 // Returns: ESHM_SUCCESS on success, error code on failure
 int eshm_write(ESHMHandle* handle, const void* data, size_t size);
 
+// Write several messages as one batch (a single update of the channel)
+// Each message is stored as a uint32_t length (host byte order) followed by
+// its bytes; the reader receives the whole batch with one read and walks it
+// with eshm_batch_next.
+// Parameters:
+//   handle: ESHM handle
+//   iov: messages to write
+//   count: number of messages
+// Returns: ESHM_SUCCESS on success, ESHM_ERROR_BUFFER_TOO_SMALL if the framed
+//          batch exceeds ESHM_MAX_DATA_SIZE, error code on failure
+int eshm_write_batch(ESHMHandle* handle, const struct iovec* iov, size_t count);
+
+// Get the next message of a batch written by eshm_write_batch
+// Parameters:
+//   batch: data returned by a read
+//   size: number of bytes read
+//   offset: position in batch, start at 0; advanced past the returned message
+//   message: receives a pointer to the message bytes (inside batch)
+//   message_size: receives the message size
+// Returns: true if a message was returned, false at the end of the batch
+bool eshm_batch_next(const void* batch, size_t size, size_t* offset,
+                     const void** message, size_t* message_size);
+
 // Simple read with default timeout (1000ms)
 // Parameters:
 //   handle: ESHM handle
@@ -106,6 +130,13 @@ int eshm_read_data(ESHMHandle* handle,
 //   type: DataType of the value (0=INTEGER, 1=BOOLEAN, 2=REAL, 3=STRING, 4=BINARY)
 void eshm_free_value(void* value, uint8_t type);
 
+// Free all values returned by one eshm_read_data call
+// Parameters:
+//   values: out_values array passed to eshm_read_data (entries are reset to NULL)
+//   types: out_types array passed to eshm_read_data
+//   count: item_count returned by eshm_read_data
+void eshm_free_values(void** values, const uint8_t* types, int count);
+
 // Update heartbeat (called automatically by read/write, but can be called manually)
 // Parameters:
 //   handle: ESHM handle
@@ -119,6 +150,15 @@ int eshm_update_heartbeat(ESHMHandle* handle);
 // Returns: ESHM_SUCCESS on success, error code on failure
 int eshm_check_remote_alive(ESHMHandle* handle, bool* is_alive);
 
+// Wait until the remote endpoint has attached (its alive flag in the header
+// is set), blocking on a futex instead of polling
+// Parameters:
+//   handle: ESHM handle
+//   timeout_ms: timeout in milliseconds (0 = just check)
+// Returns: ESHM_SUCCESS once attached, ESHM_ERROR_TIMEOUT if it did not attach in time,
+//          error code on failure
+int eshm_wait_remote(ESHMHandle* handle, uint32_t timeout_ms);
+
 // Get statistics
 // Parameters:
 //   handle: ESHM handle
@@ -63,7 +63,9 @@ struct ESHMChannel {
     uint8_t data[ESHM_MAX_DATA_SIZE]; // Data buffer
     volatile uint64_t write_count;     // Number of writes
     volatile uint64_t read_count;      // Number of reads
-    uint8_t padding[48];               // Cache line padding
+    volatile uint32_t wake_seq;        // Bumped on every write, blocked readers futex-wait on it
+    volatile uint32_t waiters;         // Number of readers blocked on wake_seq
+    uint8_t padding[40];               // Cache line padding
 } __attribute__((aligned(64)));
 
 // Shared memory header with cache-line alignment
@@ -12,13 +12,29 @@ mkdir -p build
 cd build
 
 # Build shared library - need C++17 for std::variant in data_handler
-# Include data_handler and asn1 encode/decode for decoding support
+# Include data_handler and asn1 encode/decode for decoding support, and the
+# combined encode+write / read+decode API used by eshm_data.py
 g++ -shared -fPIC -o libeshm.so \
     ../src/eshm.cpp \
     ../src/data_handler.cpp \
+    ../src/eshm_data_api.cpp \
     ../src/asn1_encode.cpp \
     ../src/asn1_decode.cpp \
     -I../include -pthread -lrt -O3 -Wall -Wextra -std=c++17
 
 echo "Shared library built successfully: build/libeshm.so"
+
+# Optional: compiled DER encoder/decoder used by data_handler.py and compiled
+# write/read calls used by eshm.py when present
+if python3 -c "import Cython" 2>/dev/null; then
+    echo "Building Cython extensions..."
+    # eshm_cy links against build/libeshm.so and finds it relative to itself at runtime
+    BUILD_DIR="$(pwd)"
+    (cd ../py && CFLAGS="-O3" LDFLAGS="-L$BUILD_DIR -Wl,-rpath,\$ORIGIN/../build" \
+        cythonize -q -i -3 data_handler_cy.pyx eshm_cy.pyx)
+    echo "Cython extensions built: py/data_handler_cy*.so, py/eshm_cy*.so"
+else
+    echo "Cython not found - data_handler.py and eshm.py will use pure Python/ctypes (or cffi if installed)"
+fi
+
 echo "Python wrapper is ready to use!"
@@ -6,10 +6,38 @@ using ASN.1 DER format, compatible with the C++ DataHandler implementation.
 """
 
 import struct
-from typing import Union, List, Dict, Any, Tuple
+from functools import lru_cache
+from typing import Union, List, Dict, Any, Callable, Optional, Tuple
 from enum import IntEnum
 
 
+# Pre-compiled struct formats for the IEEE 754 REAL encoding
+_REAL_TLV = struct.Struct('>BBBd')  # tag + length + NR3 marker + big-endian double
+_DOUBLE_BE = struct.Struct('>d')
+
+# Fixed encodings written in one copy
+_BOOLEAN_TRUE = b'\x01\x01\xff'
+_BOOLEAN_FALSE = b'\x01\x01\x00'
+_REAL_ZERO = b'\x09\x00'
+
+# Long-form lengths with 1 and 2 length octets
+_LENGTH_1 = struct.Struct('>BB')
+_LENGTH_2 = struct.Struct('>BH')
+
+# Whole INTEGER TLVs (tag + length + value) for the value sizes struct can pack
+_INTEGER_TLV = {
+    1: struct.Struct('>BBb'),
+    2: struct.Struct('>BBh'),
+    4: struct.Struct('>BBi'),
+    8: struct.Struct('>BBq'),
+}
+
+# Fixed-size SEQUENCE length: long form, 4 bytes
+_SEQUENCE_LENGTH = struct.Struct('>BI')
+_SEQUENCE_HEADER = struct.Struct('>BBI')
+_SEQUENCE_LENGTH_PLACEHOLDER = b'\x84\x00\x00\x00\x00'
+
+
 class Tag(IntEnum):
     """ASN.1 Universal Tags"""
     BOOLEAN = 0x01
@@ -21,6 +49,15 @@ class Tag(IntEnum):
     SEQUENCE = 0x10
 
 
+# Plain-int tags for the codec hot paths (IntEnum member lookups are slow)
+_TAG_BOOLEAN = int(Tag.BOOLEAN)
+_TAG_INTEGER = int(Tag.INTEGER)
+_TAG_OCTET_STRING = int(Tag.OCTET_STRING)
+_TAG_REAL = int(Tag.REAL)
+_TAG_UTF8_STRING = int(Tag.UTF8_STRING)
+_TAG_SEQUENCE = int(Tag.SEQUENCE)
+
+
 class AppTag(IntEnum):
     """Custom application tags for protocol"""
     EVENT = 0x80
@@ -41,116 +78,102 @@ class DataType(IntEnum):
     IMAGE_FRAME = 7
 
 
+# DataType members by value (cheaper than calling DataType() per decoded item)
+_DATA_TYPES = {int(data_type): data_type for data_type in DataType}
+
+# Encoded INTEGER TLV of every type descriptor, for the homogeneous type sequence
+_TYPE_TLVS = {data_type: bytes((_TAG_INTEGER, 1, data_type)) for data_type in DataType}
+
+
 class DEREncoder:
     """ASN.1 DER Encoder"""
 
     def __init__(self):
+        # bytearray over-allocates geometrically, so appends are amortized O(1)
         self.buffer = bytearray()
 
+    def _write_tlv(self, tag: int, data: bytes):
+        """Write tag, length and payload"""
+        buffer = self.buffer
+        length = len(data)
+        buffer.append(tag)
+        if length < 128:
+            buffer.append(length)
+        else:
+            self.encode_length(length)
+        buffer += data
+
     def encode_tag(self, tag: int):
         """Encode ASN.1 tag"""
         self.buffer.append(tag)
 
+    def write_raw(self, data: bytes):
+        """Append already encoded bytes"""
+        self.buffer += data
+
     def encode_length(self, length: int):
         """Encode ASN.1 length"""
         if length < 128:
             self.buffer.append(length)
+        elif length < 256:
+            self.buffer += _LENGTH_1.pack(0x81, length)
+        elif length < 65536:
+            self.buffer += _LENGTH_2.pack(0x82, length)
         else:
             # Long form
             num_bytes = (length.bit_length() + 7) // 8
             self.buffer.append(0x80 | num_bytes)
-            for i in range(num_bytes - 1, -1, -1):
-                self.buffer.append((length >> (i * 8)) & 0xFF)
+            self.buffer += length.to_bytes(num_bytes, 'big')
 
     def encode_integer(self, value: int):
         """Encode INTEGER"""
-        self.encode_tag(Tag.INTEGER)
-
-        # Convert to bytes (two's complement for negative)
-        if value == 0:
-            data = bytes([0])
+        # Two's complement, always leaving room for the sign bit
+        num_bytes = (value.bit_length() + 8) // 8
+        tlv = _INTEGER_TLV.get(num_bytes)
+        if tlv is not None:
+            self.buffer += tlv.pack(_TAG_INTEGER, num_bytes, value)
         else:
-            # Determine sign
-            negative = value < 0
-            if negative:
-                # Two's complement
-                value = -value
-                num_bytes = (value.bit_length() + 8) // 8
-                value = (1 << (num_bytes * 8)) - value
-            else:
-                num_bytes = (value.bit_length() + 8) // 8
-
-            data = value.to_bytes(num_bytes, byteorder='big', signed=False)
-
-            # Ensure proper sign bit
-            if not negative and data[0] & 0x80:
-                data = b'\x00' + data
-
-        self.encode_length(len(data))
-        self.buffer.extend(data)
+            self._write_tlv(_TAG_INTEGER, value.to_bytes(num_bytes, byteorder='big', signed=True))
 
     def encode_boolean(self, value: bool):
         """Encode BOOLEAN"""
-        self.encode_tag(Tag.BOOLEAN)
-        self.encode_length(1)
-        self.buffer.append(0xFF if value else 0x00)
+        self.buffer += _BOOLEAN_TRUE if value else _BOOLEAN_FALSE
 
     def encode_real(self, value: float):
         """Encode REAL using ISO 6093 NR3 format (IEEE 754 binary64)"""
-        self.encode_tag(Tag.REAL)
-
         if value == 0.0:
-            self.encode_length(0)
+            self.buffer += _REAL_ZERO
             return
 
         # ISO 6093 NR3 format: header (0x03) + 8 bytes IEEE 754 double
-        data = bytearray([0x03])  # ISO 6093 NR3 marker
-
-        # Pack IEEE 754 double in big-endian
-        bits = struct.unpack('>Q', struct.pack('>d', value))[0]
-        for i in range(7, -1, -1):
-            data.append((bits >> (i * 8)) & 0xFF)
-
-        self.encode_length(len(data))
-        self.buffer.extend(data)
+        self.buffer += _REAL_TLV.pack(_TAG_REAL, _REAL_TLV.size - 2, 0x03, value)
 
     def encode_utf8_string(self, value: str):
         """Encode UTF8_STRING"""
-        self.encode_tag(Tag.UTF8_STRING)
-        data = value.encode('utf-8')
-        self.encode_length(len(data))
-        self.buffer.extend(data)
+        self._write_tlv(_TAG_UTF8_STRING, value.encode('utf-8'))
 
     def encode_octet_string(self, value: bytes):
         """Encode OCTET_STRING"""
-        self.encode_tag(Tag.OCTET_STRING)
-        self.encode_length(len(value))
-        self.buffer.extend(value)
+        self._write_tlv(_TAG_OCTET_STRING, value)
 
     def begin_sequence(self) -> int:
         """Begin SEQUENCE, returns position"""
-        self.encode_tag(Tag.SEQUENCE)
+        self.buffer.append(_TAG_SEQUENCE)
         start_pos = len(self.buffer)
-        # Reserve space for length (we'll fill it in end_sequence)
-        self.buffer.append(0)  # Placeholder
+        # Placeholder for length (long form with 4 bytes, as the C++ encoder does)
+        # so end_sequence can patch it in place without shifting the contents
+        self.buffer += _SEQUENCE_LENGTH_PLACEHOLDER
         return start_pos
 
     def end_sequence(self, start_pos: int):
         """End SEQUENCE, update length"""
-        seq_length = len(self.buffer) - start_pos - 1
+        seq_length = len(self.buffer) - start_pos - _SEQUENCE_LENGTH.size
+        _SEQUENCE_LENGTH.pack_into(self.buffer, start_pos, 0x84, seq_length)
 
-        # Encode the length
-        if seq_length < 128:
-            self.buffer[start_pos] = seq_length
-        else:
-            # Long form - need to insert bytes
-            num_bytes = (seq_length.bit_length() + 7) // 8
-            length_bytes = bytearray([0x80 | num_bytes])
-            for i in range(num_bytes - 1, -1, -1):
-                length_bytes.append((seq_length >> (i * 8)) & 0xFF)
-
-            # Replace placeholder with actual length
-            self.buffer[start_pos:start_pos+1] = length_bytes
+    def encode_sequence(self, content: bytes):
+        """Encode a complete SEQUENCE from already encoded content"""
+        self.buffer += _SEQUENCE_HEADER.pack(_TAG_SEQUENCE, 0x84, len(content))
+        self.buffer += content
 
     def get_data(self) -> bytes:
         """Get encoded data"""
@@ -167,6 +190,8 @@ class DERDecoder:
     def __init__(self, data: bytes):
         self.data = data
         self.pos = 0
+        # Zero-copy view for slicing field payloads
+        self._mv = memoryview(data)
 
     def decode_tag(self) -> int:
         """Decode ASN.1 tag"""
@@ -189,25 +214,23 @@ class DERDecoder:
         else:
             # Long form
             num_bytes = first_byte & 0x7F
-            length = 0
-            for _ in range(num_bytes):
-                if self.pos >= len(self.data):
-                    raise ValueError("Unexpected end of data")
-                length = (length << 8) | self.data[self.pos]
-                self.pos += 1
+            if self.pos + num_bytes > len(self.data):
+                raise ValueError("Unexpected end of data")
+            length = int.from_bytes(self._mv[self.pos:self.pos + num_bytes], 'big')
+            self.pos += num_bytes
             return length
 
     def decode_integer(self) -> int:
         """Decode INTEGER"""
         tag = self.decode_tag()
-        if tag != Tag.INTEGER:
+        if tag != _TAG_INTEGER:
             raise ValueError(f"Expected INTEGER tag, got {tag}")
 
         length = self.decode_length()
         if self.pos + length > len(self.data):
             raise ValueError("Unexpected end of data")
 
-        data = self.data[self.pos:self.pos + length]
+        data = self._mv[self.pos:self.pos + length]
         self.pos += length
 
         # Convert from bytes (two's complement)
@@ -217,7 +240,7 @@ class DERDecoder:
     def decode_boolean(self) -> bool:
         """Decode BOOLEAN"""
         tag = self.decode_tag()
-        if tag != Tag.BOOLEAN:
+        if tag != _TAG_BOOLEAN:
             raise ValueError(f"Expected BOOLEAN tag, got {tag}")
 
         length = self.decode_length()
@@ -233,8 +256,15 @@ class DERDecoder:
 
     def decode_real(self) -> float:
         """Decode REAL"""
+        # Fast path: whole NR3 TLV as written by DEREncoder.encode_real
+        if len(self.data) - self.pos >= _REAL_TLV.size:
+            tag, length, header, value = _REAL_TLV.unpack_from(self.data, self.pos)
+            if tag == _TAG_REAL and length == _REAL_TLV.size - 2 and header == 0x03:
+                self.pos += _REAL_TLV.size
+                return value
+
         tag = self.decode_tag()
-        if tag != Tag.REAL:
+        if tag != _TAG_REAL:
             raise ValueError(f"Expected REAL tag, got {tag}")
 
         length = self.decode_length()
@@ -254,12 +284,8 @@ class DERDecoder:
                 raise ValueError("Unexpected end of data")
 
             # Read 8 bytes of IEEE 754 double in big-endian
-            bits = 0
-            for _ in range(8):
-                bits = (bits << 8) | self.data[self.pos]
-                self.pos += 1
-
-            value = struct.unpack('>d', struct.pack('>Q', bits))[0]
+            value = _DOUBLE_BE.unpack_from(self.data, self.pos)[0]
+            self.pos += 8
             return value
         else:
             # Legacy format (if needed)
@@ -268,35 +294,35 @@ class DERDecoder:
     def decode_utf8_string(self) -> str:
         """Decode UTF8_STRING"""
         tag = self.decode_tag()
-        if tag != Tag.UTF8_STRING:
+        if tag != _TAG_UTF8_STRING:
             raise ValueError(f"Expected UTF8_STRING tag, got {tag}")
 
         length = self.decode_length()
         if self.pos + length > len(self.data):
             raise ValueError("Unexpected end of data")
 
-        data = self.data[self.pos:self.pos + length]
+        data = self._mv[self.pos:self.pos + length]
         self.pos += length
-        return data.decode('utf-8')
+        return str(data, 'utf-8')
 
     def decode_octet_string(self) -> bytes:
         """Decode OCTET_STRING"""
         tag = self.decode_tag()
-        if tag != Tag.OCTET_STRING:
+        if tag != _TAG_OCTET_STRING:
             raise ValueError(f"Expected OCTET_STRING tag, got {tag}")
 
         length = self.decode_length()
         if self.pos + length > len(self.data):
             raise ValueError("Unexpected end of data")
 
-        data = self.data[self.pos:self.pos + length]
+        data = self._mv[self.pos:self.pos + length]
         self.pos += length
         return bytes(data)
 
     def begin_sequence(self) -> int:
         """Begin SEQUENCE, returns end position"""
         tag = self.decode_tag()
-        if tag != Tag.SEQUENCE:
+        if tag != _TAG_SEQUENCE:
             raise ValueError(f"Expected SEQUENCE tag, got {tag}")
 
         length = self.decode_length()
@@ -308,15 +334,104 @@ class DERDecoder:
         return self.pos < len(self.data)
 
 
+try:
+    # Compiled drop-in replacements (py/data_handler_cy.pyx, see build_shared_lib.sh)
+    from data_handler_cy import DEREncoder, DERDecoder
+except ImportError:
+    pass
+
+
+@lru_cache(maxsize=1024)
+def _key_tlv(key: str) -> bytes:
+    """Encoded UTF8_STRING TLV of a key (the same keys repeat across messages)"""
+    encoder = DEREncoder()
+    encoder.encode_utf8_string(key)
+    return encoder.get_data()
+
+
+# Per-type value codecs for the data sequence (unbound, called with the encoder/decoder)
+_ENCODERS = {
+    DataType.INTEGER: DEREncoder.encode_integer,
+    DataType.BOOLEAN: DEREncoder.encode_boolean,
+    DataType.REAL: DEREncoder.encode_real,
+    DataType.STRING: DEREncoder.encode_utf8_string,
+    DataType.BINARY: DEREncoder.encode_octet_string,
+}
+
+_DECODERS = {
+    DataType.INTEGER: DERDecoder.decode_integer,
+    DataType.BOOLEAN: DERDecoder.decode_boolean,
+    DataType.REAL: DERDecoder.decode_real,
+    DataType.STRING: DERDecoder.decode_utf8_string,
+    DataType.BINARY: DERDecoder.decode_octet_string,
+}
+
+
+def _frame_sequences(types: bytes, keys: bytes, data: bytes) -> bytes:
+    """Wrap encoded type, key and data sequence contents into the outer SEQUENCE"""
+    header = _SEQUENCE_HEADER.pack
+    return b''.join((
+        header(_TAG_SEQUENCE, 0x84, len(types) + len(keys) + len(data) + 3 * _SEQUENCE_HEADER.size),
+        header(_TAG_SEQUENCE, 0x84, len(types)), types,
+        header(_TAG_SEQUENCE, 0x84, len(keys)), keys,
+        header(_TAG_SEQUENCE, 0x84, len(data)), data,
+    ))
+
+
+def _frame_sequences_into(out, types: bytes, keys: bytes, data: bytes) -> int:
+    """Same as _frame_sequences, written to the start of a writable buffer; returns the size"""
+    header_size = _SEQUENCE_HEADER.size
+    size = len(types) + len(keys) + len(data) + 4 * header_size
+    if size > len(out):
+        raise ValueError(f"Output buffer too small: need {size} bytes, have {len(out)}")
+
+    pack_into = _SEQUENCE_HEADER.pack_into
+    pack_into(out, 0, _TAG_SEQUENCE, 0x84, size - header_size)
+    offset = header_size
+    for content in (types, keys, data):
+        pack_into(out, offset, _TAG_SEQUENCE, 0x84, len(content))
+        offset += header_size
+        out[offset:offset + len(content)] = content
+        offset += len(content)
+    return offset
+
+
 class DataItem:
     """Data item in the exchange"""
 
+    __slots__ = ('type', 'key', 'value')
+
     def __init__(self, data_type: DataType, key: str, value: Any):
         self.type = data_type
         self.key = key
         self.value = value
 
 
+class DataBatch:
+    """Data items stored as three parallel lists (types, keys, values)"""
+
+    __slots__ = ('types', 'keys', 'values')
+
+    def __init__(self, types: List[DataType] = None, keys: List[str] = None,
+                 values: List[Any] = None):
+        self.types = [] if types is None else types
+        self.keys = [] if keys is None else keys
+        self.values = [] if values is None else values
+
+    def append(self, data_type: DataType, key: str, value: Any):
+        """Add one item"""
+        self.types.append(data_type)
+        self.keys.append(key)
+        self.values.append(value)
+
+    def items(self) -> List[DataItem]:
+        """Convert to a list of DataItem objects"""
+        return [DataItem(*item) for item in zip(self.types, self.keys, self.values)]
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+
 class DataHandler:
     """
     DataHandler for encoding/decoding structured data using ASN.1 DER
@@ -359,43 +474,69 @@ class DataHandler:
         Returns:
             Encoded bytes
         """
-        encoder = DEREncoder()
+        return _frame_sequences(*self._encode_sequences(items))
 
-        # Outer sequence
-        start = encoder.begin_sequence()
+    def encode_into(self, items: List[DataItem], out) -> int:
+        """
+        Encode data items into a caller-owned buffer
 
-        # 1. Type sequence
-        type_start = encoder.begin_sequence()
-        for item in items:
-            encoder.encode_integer(item.type)
-        encoder.end_sequence(type_start)
+        Same output as encode_data_buffer, without allocating the final bytes.
 
-        # 2. Key sequence
-        key_start = encoder.begin_sequence()
-        for item in items:
-            encoder.encode_utf8_string(item.key)
-        encoder.end_sequence(key_start)
+        Args:
+            items: List of DataItem objects
+            out: Writable buffer (e.g. bytearray), reused across calls
 
-        # 3. Data sequence
-        data_start = encoder.begin_sequence()
+        Returns:
+            Number of bytes written to the start of out
+
+        Raises:
+            ValueError: If out is too small for the encoded message
+        """
+        return _frame_sequences_into(out, *self._encode_sequences(items))
+
+    @staticmethod
+    def _encode_sequences(items: List[DataItem]) -> Tuple[bytes, bytes, bytes]:
+        """Contents of the type, key and data sequences for a list of items"""
+        # Single pass: collect type and key TLVs, encode values separately
+        type_tlvs = []
+        key_tlvs = []
+        data = DEREncoder()
+        get_encoder = _ENCODERS.get
         for item in items:
-            if item.type == DataType.INTEGER:
-                encoder.encode_integer(item.value)
-            elif item.type == DataType.BOOLEAN:
-                encoder.encode_boolean(item.value)
-            elif item.type == DataType.REAL:
-                encoder.encode_real(item.value)
-            elif item.type == DataType.STRING:
-                encoder.encode_utf8_string(item.value)
-            elif item.type == DataType.BINARY:
-                encoder.encode_octet_string(item.value)
-            else:
+            encode = get_encoder(item.type)
+            if encode is None:
                 raise ValueError(f"Unsupported data type: {item.type}")
-        encoder.end_sequence(data_start)
+            type_tlvs.append(_TYPE_TLVS[item.type])
+            key_tlvs.append(_key_tlv(item.key))
+            encode(data, item.value)
+
+        return b''.join(type_tlvs), b''.join(key_tlvs), data.get_data()
+
+    def encode_data_batch(self, batch: DataBatch) -> bytes:
+        """
+        Encode a DataBatch to buffer using three-sequence protocol
+
+        Same output as encode_data_buffer, but iterates the parallel lists
+        directly instead of one DataItem per item.
 
-        encoder.end_sequence(start)
+        Returns:
+            Encoded bytes
+        """
+        type_tlvs = []
+        data = DEREncoder()
+        get_encoder = _ENCODERS.get
+        for data_type, value in zip(batch.types, batch.values):
+            encode = get_encoder(data_type)
+            if encode is None:
+                raise ValueError(f"Unsupported data type: {data_type}")
+            type_tlvs.append(_TYPE_TLVS[data_type])
+            encode(data, value)
 
-        return encoder.get_data()
+        return _frame_sequences(
+            b''.join(type_tlvs),
+            b''.join([_key_tlv(key) for key in batch.keys]),
+            data.get_data(),
+        )
 
     def decode_data_buffer(self, buffer: bytes) -> List[DataItem]:
         """
@@ -407,6 +548,18 @@ class DataHandler:
         Returns:
             List of DataItem objects
         """
+        return self.decode_data_batch(buffer).items()
+
+    def decode_data_batch(self, buffer: bytes) -> DataBatch:
+        """
+        Decode data buffer into a DataBatch using three-sequence protocol
+
+        Args:
+            buffer: Encoded bytes
+
+        Returns:
+            DataBatch with the decoded types, keys and values
+        """
         decoder = DERDecoder(buffer)
 
         # Outer sequence
@@ -415,35 +568,40 @@ class DataHandler:
         # 1. Type sequence
         type_end = decoder.begin_sequence()
         types = []
+        types_append = types.append
+        decode_integer = decoder.decode_integer
+        data_types = _DATA_TYPES
         while decoder.pos < type_end:
-            types.append(DataType(decoder.decode_integer()))
+            value = decode_integer()
+            data_type = data_types.get(value)
+            if data_type is None:
+                data_type = DataType(value)  # raises ValueError
+            types_append(data_type)
 
         # 2. Key sequence
         key_end = decoder.begin_sequence()
         keys = []
+        keys_append = keys.append
+        decode_utf8_string = decoder.decode_utf8_string
         while decoder.pos < key_end:
-            keys.append(decoder.decode_utf8_string())
+            keys_append(decode_utf8_string())
 
         # 3. Data sequence
         data_end = decoder.begin_sequence()
-        items = []
-        for i, (data_type, key) in enumerate(zip(types, keys)):
-            if data_type == DataType.INTEGER:
-                value = decoder.decode_integer()
-            elif data_type == DataType.BOOLEAN:
-                value = decoder.decode_boolean()
-            elif data_type == DataType.REAL:
-                value = decoder.decode_real()
-            elif data_type == DataType.STRING:
-                value = decoder.decode_utf8_string()
-            elif data_type == DataType.BINARY:
-                value = decoder.decode_octet_string()
-            else:
+        # Types and keys pair up like zip(): entries without a partner are dropped
+        del types[len(keys):]
+        del keys[len(types):]
+        values = []
+        values_append = values.append
+        get_decoder = _DECODERS.get
+        for data_type in types:
+            decode = get_decoder(data_type)
+            if decode is None:
                 raise ValueError(f"Unsupported data type: {data_type}")
 
-            items.append(DataItem(data_type, key, value))
+            values_append(decode(decoder))
 
-        return items
+        return DataBatch(types, keys, values)
 
     @staticmethod
     def extract_simple_values(items: List[DataItem]) -> Dict[str, Any]:
@@ -459,6 +617,131 @@ class DataHandler:
         return {item.key: item.value for item in items}
 
 
+# Compiled encoders by schema
+_COMPILED_ENCODERS: Dict[Tuple[Tuple[int, str], ...], Callable[[List[Any]], bytes]] = {}
+
+
+def compile_encoder(schema: List[Tuple[DataType, str]]) -> Callable[[List[Any]], bytes]:
+    """
+    Build an encoder specialized for a fixed list of (type, key) pairs
+
+    The type and key sequences are encoded once, and the generated function
+    only encodes the values, with no per-item type dispatch. Output is the
+    same as encode_data_buffer for the same items. Encoders are cached by
+    schema.
+
+    Args:
+        schema: List of (DataType, key) tuples
+
+    Returns:
+        Function taking a list of values (in schema order) and returning
+        the encoded bytes
+    """
+    schema = tuple((DataType(data_type), key) for data_type, key in schema)
+    encode = _COMPILED_ENCODERS.get(schema)
+    if encode is not None:
+        return encode
+
+    # Type and key sequences never change for a schema
+    namespace = {
+        'DEREncoder': DEREncoder,
+        'frame': _frame_sequences,
+        'types': b''.join([_TYPE_TLVS[data_type] for data_type, _ in schema]),
+        'keys': b''.join([_key_tlv(key) for _, key in schema]),
+    }
+    lines = [
+        "def encode(values):",
+        f"    if len(values) != {len(schema)}:",
+        f"        raise ValueError(f\"Expected {len(schema)} values, got {{len(values)}}\")",
+        "    data = DEREncoder()",
+    ]
+    for i, (data_type, _) in enumerate(schema):
+        encode_value = _ENCODERS.get(data_type)
+        if encode_value is None:
+            raise ValueError(f"Unsupported data type: {data_type}")
+        namespace[f'encode_{i}'] = encode_value
+        lines.append(f"    encode_{i}(data, values[{i}])")
+    lines.append("    return frame(types, keys, data.get_data())")
+    exec("\n".join(lines), namespace)
+
+    encode = _COMPILED_ENCODERS[schema] = namespace['encode']
+    return encode
+
+
+# Compiled decoders by (schema, count)
+_COMPILED_DECODERS: Dict[Tuple[Tuple[Tuple[int, str], ...], int], Callable[[bytes], List[Any]]] = {}
+
+
+def _decode_schema_values(buffer: bytes, schema: Tuple[Tuple[int, str], ...],
+                          count: int) -> List[Any]:
+    """Generic decode for compile_decoder, used when the prefix comparison fails"""
+    batch = DataHandler().decode_data_batch(buffer)
+    if tuple(zip(batch.types, batch.keys)) != schema:
+        raise ValueError("Buffer does not match the decoder schema")
+    return batch.values[:count]
+
+
+def compile_decoder(schema: List[Tuple[DataType, str]],
+                    count: Optional[int] = None) -> Callable[[bytes], List[Any]]:
+    """
+    Build a decoder specialized for a fixed list of (type, key) pairs
+
+    Counterpart of compile_encoder: the generated function checks the type
+    and key sequences against the schema with one bytes comparison instead
+    of decoding them, then decodes only the values, in schema order, with
+    no DataItem or dict per message. Decoders are cached by schema.
+
+    Args:
+        schema: List of (DataType, key) tuples
+        count: Only decode the first count values and skip the rest
+            (default: all)
+
+    Returns:
+        Function taking encoded bytes and returning the list of values (in
+        schema order); it raises ValueError if the buffer was encoded with a
+        different schema
+    """
+    schema = tuple((DataType(data_type), key) for data_type, key in schema)
+    count = len(schema) if count is None else min(count, len(schema))
+    decode = _COMPILED_DECODERS.get((schema, count))
+    if decode is not None:
+        return decode
+
+    types = b''.join([_TYPE_TLVS[data_type] for data_type, _ in schema])
+    keys = b''.join([_key_tlv(key) for _, key in schema])
+    header = _SEQUENCE_HEADER.pack
+    namespace = {
+        'DERDecoder': DERDecoder,
+        'fallback': _decode_schema_values,
+        'schema': schema,
+        # Type and key sequences as the encoders frame them (see _frame_sequences)
+        'prefix': b''.join((header(_TAG_SEQUENCE, 0x84, len(types)), types,
+                            header(_TAG_SEQUENCE, 0x84, len(keys)), keys)),
+    }
+    lines = [
+        "def decode(buffer):",
+        "    decoder = DERDecoder(buffer)",
+        "    decoder.begin_sequence()",
+        "    start = decoder.pos",
+        "    if buffer[start:start + len(prefix)] != prefix:",
+        f"        return fallback(buffer, schema, {count})",
+        "    decoder.pos = start + len(prefix)",
+        "    decoder.begin_sequence()",
+        "    return [",
+    ]
+    for i, (data_type, _) in enumerate(schema[:count]):
+        decode_value = _DECODERS.get(data_type)
+        if decode_value is None:
+            raise ValueError(f"Unsupported data type: {data_type}")
+        namespace[f'decode_{i}'] = decode_value
+        lines.append(f"        decode_{i}(decoder),")
+    lines.append("    ]")
+    exec("\n".join(lines), namespace)
+
+    decode = _COMPILED_DECODERS[(schema, count)] = namespace['decode']
+    return decode
+
+
 # Example usage and test
 if __name__ == "__main__":
     print("Testing DataHandler...")
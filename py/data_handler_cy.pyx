@@ -0,0 +1,396 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled ASN.1 DER encoder/decoder for data_handler
+
+Drop-in replacement for the pure-Python DEREncoder/DERDecoder classes in
+data_handler.py, with the same methods, wire format and error messages.
+Built in place by build_shared_lib.sh when Cython is installed; when the
+extension is not present data_handler.py keeps using the Python classes.
+"""
+
+from cpython.bytearray cimport PyByteArray_AS_STRING, PyByteArray_Resize
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.unicode cimport PyUnicode_DecodeUTF8
+from libc.stdint cimport int64_t, uint64_t
+from libc.string cimport memcpy, memset
+
+
+# ASN.1 Universal Tags (mirrors data_handler.Tag)
+cdef enum:
+    TAG_BOOLEAN = 0x01
+    TAG_INTEGER = 0x02
+    TAG_OCTET_STRING = 0x04
+    TAG_REAL = 0x09
+    TAG_UTF8_STRING = 0x0C
+    TAG_SEQUENCE = 0x10
+
+
+cdef inline int _length_octets(uint64_t length) nogil:
+    """Number of octets needed to encode a length (including long-form prefix)"""
+    cdef int n = 0
+    if length < 128:
+        return 1
+    while length:
+        n += 1
+        length >>= 8
+    return n + 1
+
+
+cdef class DEREncoder:
+    """ASN.1 DER Encoder"""
+
+    cdef bytearray _buf
+    cdef Py_ssize_t _size
+
+    def __cinit__(self):
+        self._buf = bytearray(256)
+        self._size = 0
+
+    cdef unsigned char* _reserve(self, Py_ssize_t n) except NULL:
+        """Make room for n more bytes and return a pointer to the write cursor"""
+        cdef Py_ssize_t need = self._size + n
+        cdef Py_ssize_t cap = len(self._buf)
+        if need > cap:
+            while cap < need:
+                cap *= 2
+            PyByteArray_Resize(self._buf, cap)
+        return <unsigned char*>PyByteArray_AS_STRING(self._buf) + self._size
+
+    cdef int _put_length(self, uint64_t length) except -1:
+        cdef int n = _length_octets(length)
+        cdef unsigned char* p = self._reserve(n)
+        cdef int i
+        if n == 1:
+            p[0] = <unsigned char>length
+        else:
+            p[0] = 0x80 | (n - 1)
+            for i in range(n - 1, 0, -1):
+                p[i] = length & 0xFF
+                length >>= 8
+        self._size += n
+        return 0
+
+    cdef int _put_bytes(self, const char* data, Py_ssize_t n) except -1:
+        cdef unsigned char* p = self._reserve(n)
+        memcpy(p, data, n)
+        self._size += n
+        return 0
+
+    def encode_tag(self, int tag):
+        """Encode ASN.1 tag"""
+        self._reserve(1)[0] = <unsigned char>tag
+        self._size += 1
+
+    def write_raw(self, const unsigned char[:] data):
+        """Append already encoded bytes"""
+        cdef Py_ssize_t n = data.shape[0]
+        if n:
+            self._put_bytes(<const char*>&data[0], n)
+
+    def encode_length(self, Py_ssize_t length):
+        """Encode ASN.1 length"""
+        self._put_length(length)
+
+    def encode_integer(self, value):
+        """Encode INTEGER"""
+        cdef int64_t v
+        cdef uint64_t mag
+        cdef int bits = 0
+        cdef int num_bytes, i, shift
+        cdef unsigned char* p
+        cdef bytes data
+
+        self.encode_tag(TAG_INTEGER)
+        try:
+            v = value
+        except OverflowError:
+            # Beyond int64: same two's complement rule, done in Python
+            num_bytes = (value.bit_length() + 8) // 8
+            data = value.to_bytes(num_bytes, byteorder='big', signed=True)
+            self._put_length(num_bytes)
+            self._put_bytes(data, num_bytes)
+            return
+
+        # Two's complement, always leaving room for the sign bit
+        # (magnitude in unsigned arithmetic: -v overflows for INT64_MIN)
+        mag = (~<uint64_t>v) + 1 if v < 0 else <uint64_t>v
+        while mag:
+            bits += 1
+            mag >>= 1
+        num_bytes = (bits + 8) // 8
+
+        self._put_length(num_bytes)
+        p = self._reserve(num_bytes)
+        for i in range(num_bytes):
+            shift = 8 * (num_bytes - 1 - i)
+            if shift >= 64:
+                p[i] = 0xFF if v < 0 else 0x00
+            else:
+                p[i] = (v >> shift) & 0xFF
+        self._size += num_bytes
+
+    def encode_boolean(self, value):
+        """Encode BOOLEAN"""
+        cdef unsigned char* p = self._reserve(3)
+        p[0] = TAG_BOOLEAN
+        p[1] = 1
+        p[2] = 0xFF if value else 0x00
+        self._size += 3
+
+    def encode_real(self, double value):
+        """Encode REAL using ISO 6093 NR3 format (IEEE 754 binary64)"""
+        cdef uint64_t bits
+        cdef unsigned char* p
+        cdef int i
+
+        if value == 0.0:
+            p = self._reserve(2)
+            p[0] = TAG_REAL
+            p[1] = 0
+            self._size += 2
+            return
+
+        # ISO 6093 NR3 format: header (0x03) + 8 bytes IEEE 754 double
+        memcpy(&bits, &value, 8)
+        p = self._reserve(11)
+        p[0] = TAG_REAL
+        p[1] = 9
+        p[2] = 0x03
+        for i in range(8):
+            p[3 + i] = (bits >> (8 * (7 - i))) & 0xFF
+        self._size += 11
+
+    def encode_utf8_string(self, str value):
+        """Encode UTF8_STRING"""
+        cdef bytes data = value.encode('utf-8')
+        self.encode_tag(TAG_UTF8_STRING)
+        self._put_length(len(data))
+        self._put_bytes(data, len(data))
+
+    def encode_octet_string(self, value):
+        """Encode OCTET_STRING"""
+        # Buffer objects only: bytes(int) would encode that many zero bytes
+        cdef bytes data = value if type(value) is bytes else memoryview(value).tobytes()
+        self.encode_tag(TAG_OCTET_STRING)
+        self._put_length(len(data))
+        self._put_bytes(data, len(data))
+
+    def begin_sequence(self):
+        """Begin SEQUENCE, returns position"""
+        cdef Py_ssize_t start_pos
+        cdef unsigned char* p = self._reserve(6)
+        p[0] = TAG_SEQUENCE
+        start_pos = self._size + 1
+        # Placeholder for length (long form with 4 bytes, as the C++ encoder does)
+        # so end_sequence can patch it in place without shifting the contents
+        memset(p + 1, 0, 5)
+        p[1] = 0x84
+        self._size += 6
+        return start_pos
+
+    def end_sequence(self, Py_ssize_t start_pos):
+        """End SEQUENCE, update length"""
+        cdef uint64_t length = self._size - start_pos - 5
+        cdef unsigned char* base = <unsigned char*>PyByteArray_AS_STRING(self._buf) + start_pos
+        cdef int i
+        for i in range(4, 0, -1):
+            base[i] = length & 0xFF
+            length >>= 8
+
+    def encode_sequence(self, const unsigned char[:] content):
+        """Encode a complete SEQUENCE from already encoded content"""
+        cdef Py_ssize_t n = content.shape[0]
+        cdef unsigned char* p = self._reserve(6 + n)
+        cdef uint64_t length = n
+        cdef int i
+        p[0] = TAG_SEQUENCE
+        p[1] = 0x84
+        for i in range(5, 1, -1):
+            p[i] = length & 0xFF
+            length >>= 8
+        if n:
+            memcpy(p + 6, &content[0], n)
+        self._size += 6 + n
+
+    def get_data(self):
+        """Get encoded data"""
+        return PyBytes_FromStringAndSize(PyByteArray_AS_STRING(self._buf), self._size)
+
+    def clear(self):
+        """Clear buffer"""
+        self._size = 0
+
+
+cdef class DERDecoder:
+    """ASN.1 DER Decoder"""
+
+    cdef readonly object data
+    cdef public Py_ssize_t pos
+    cdef bytes _bytes
+    cdef const unsigned char* _p
+    cdef Py_ssize_t _len
+
+    def __cinit__(self, data):
+        self.data = data
+        self._bytes = data if type(data) is bytes else bytes(data)
+        self._p = <const unsigned char*><const char*>self._bytes
+        self._len = len(self._bytes)
+        self.pos = 0
+
+    cdef int _tag(self) except -1:
+        if self.pos >= self._len:
+            raise ValueError("Unexpected end of data")
+        self.pos += 1
+        return self._p[self.pos - 1]
+
+    cdef Py_ssize_t _length(self) except -1:
+        cdef unsigned char first_byte
+        cdef int num_bytes
+        cdef uint64_t length = 0
+
+        if self.pos >= self._len:
+            raise ValueError("Unexpected end of data")
+
+        first_byte = self._p[self.pos]
+        self.pos += 1
+
+        if first_byte < 128:
+            return first_byte
+
+        # Long form
+        num_bytes = first_byte & 0x7F
+        if num_bytes > 7:
+            # Cannot describe anything that fits in an in-memory buffer
+            raise ValueError("Unexpected end of data")
+        for _ in range(num_bytes):
+            if self.pos >= self._len:
+                raise ValueError("Unexpected end of data")
+            length = (length << 8) | self._p[self.pos]
+            self.pos += 1
+        return <Py_ssize_t>length
+
+    cdef Py_ssize_t _expect(self, int expected, str name) except -1:
+        """Decode tag + length, checking the tag and that the payload is present"""
+        cdef int tag = self._tag()
+        cdef Py_ssize_t length
+        if tag != expected:
+            raise ValueError(f"Expected {name} tag, got {tag}")
+        length = self._length()
+        if self.pos + length > self._len:
+            raise ValueError("Unexpected end of data")
+        return length
+
+    def decode_tag(self):
+        """Decode ASN.1 tag"""
+        return self._tag()
+
+    def decode_length(self):
+        """Decode ASN.1 length"""
+        return self._length()
+
+    def decode_integer(self):
+        """Decode INTEGER"""
+        cdef Py_ssize_t length = self._expect(TAG_INTEGER, "INTEGER")
+        cdef const unsigned char* p = self._p + self.pos
+        cdef uint64_t u
+        cdef int64_t value
+        cdef Py_ssize_t i
+
+        if length > 8:
+            result = int.from_bytes(self._bytes[self.pos:self.pos + length], byteorder='big', signed=True)
+            self.pos += length
+            return result
+
+        if length == 0:
+            return 0
+
+        # Sign-extend from the first octet
+        u = <uint64_t>(-1) if p[0] & 0x80 else 0
+        for i in range(length):
+            u = (u << 8) | p[i]
+        self.pos += length
+        value = <int64_t>u
+        return value
+
+    def decode_boolean(self):
+        """Decode BOOLEAN"""
+        cdef int tag = self._tag()
+        cdef Py_ssize_t length
+        if tag != TAG_BOOLEAN:
+            raise ValueError(f"Expected BOOLEAN tag, got {tag}")
+
+        length = self._length()
+        if length != 1:
+            raise ValueError(f"Invalid BOOLEAN length: {length}")
+
+        if self.pos >= self._len:
+            raise ValueError("Unexpected end of data")
+
+        self.pos += 1
+        return self._p[self.pos - 1] != 0
+
+    def decode_real(self):
+        """Decode REAL"""
+        cdef int tag = self._tag()
+        cdef Py_ssize_t length
+        cdef unsigned char header
+        cdef uint64_t bits = 0
+        cdef double value
+        cdef int i
+
+        if tag != TAG_REAL:
+            raise ValueError(f"Expected REAL tag, got {tag}")
+
+        length = self._length()
+
+        if length == 0:
+            return 0.0
+
+        if self.pos >= self._len:
+            raise ValueError("Unexpected end of data")
+
+        header = self._p[self.pos]
+        self.pos += 1
+
+        # ISO 6093 NR3 format
+        if header == 0x03:
+            if self.pos + 8 > self._len:
+                raise ValueError("Unexpected end of data")
+
+            # Read 8 bytes of IEEE 754 double in big-endian
+            for i in range(8):
+                bits = (bits << 8) | self._p[self.pos + i]
+            self.pos += 8
+            memcpy(&value, &bits, 8)
+            return value
+        else:
+            # Legacy format (if needed)
+            raise ValueError(f"Unsupported REAL encoding: {header}")
+
+    def decode_utf8_string(self):
+        """Decode UTF8_STRING"""
+        cdef Py_ssize_t length = self._expect(TAG_UTF8_STRING, "UTF8_STRING")
+        cdef Py_ssize_t start = self.pos
+        self.pos += length
+        return PyUnicode_DecodeUTF8(<const char*>self._p + start, length, NULL)
+
+    def decode_octet_string(self):
+        """Decode OCTET_STRING"""
+        cdef Py_ssize_t length = self._expect(TAG_OCTET_STRING, "OCTET_STRING")
+        cdef Py_ssize_t start = self.pos
+        self.pos += length
+        return PyBytes_FromStringAndSize(<const char*>self._p + start, length)
+
+    def begin_sequence(self):
+        """Begin SEQUENCE, returns end position"""
+        cdef int tag = self._tag()
+        cdef Py_ssize_t length
+        if tag != TAG_SEQUENCE:
+            raise ValueError(f"Expected SEQUENCE tag, got {tag}")
+
+        length = self._length()
+        return self.pos + length
+
+    def has_more_data(self):
+        """Check if more data available"""
+        return self.pos < self._len
@@ -7,9 +7,13 @@ implementation for maximum performance encoding/decoding.
 
 import ctypes
 import os
-from typing import List, Dict, Any, Union
+import struct
+import weakref
+from typing import List, Dict, Any, Sequence, Union
 from enum import IntEnum
 
+from eshm_common import marshal_arrays, marshal_items, read_binary
+
 
 class DataType(IntEnum):
     """Type descriptor for the three-sequence protocol"""
@@ -26,12 +30,45 @@ class DataType(IntEnum):
 class DataItem:
     """Data item in the exchange"""
 
+    __slots__ = ('type', 'key', 'value')
+
     def __init__(self, data_type: DataType, key: str, value: Any):
         self.type = data_type
         self.key = key
         self.value = value
 
 
+# DataType members by value (cheaper than calling DataType() per decoded item)
+_DATA_TYPES = {int(data_type): data_type for data_type in DataType}
+
+
+# Per-type conversion of decoded C values back to Python objects
+_VALUE_READERS = {
+    DataType.INTEGER: lambda ptr: ctypes.cast(ptr, ctypes.POINTER(ctypes.c_int64)).contents.value,
+    DataType.BOOLEAN: lambda ptr: ctypes.cast(ptr, ctypes.POINTER(ctypes.c_bool)).contents.value,
+    DataType.REAL: lambda ptr: ctypes.cast(ptr, ctypes.POINTER(ctypes.c_double)).contents.value,
+    DataType.STRING: lambda ptr: ctypes.cast(ptr, ctypes.c_char_p).value.decode('utf-8'),
+    DataType.BINARY: read_binary,
+}
+
+
+class _DecodeArrays:
+    """Output arrays for dh_decode, allocated once per handler"""
+
+    __slots__ = ('max_items', 'max_key_len', 'types', 'keys', 'values', '_key_buffer')
+
+    def __init__(self, max_items: int, max_key_len: int):
+        self.max_items = max_items
+        self.max_key_len = max_key_len
+        # One block for all keys, keys[i] points at its max_key_len slot
+        self._key_buffer = ctypes.create_string_buffer(max_items * max_key_len)
+        base = ctypes.addressof(self._key_buffer)
+        self.keys = (ctypes.c_char_p * max_items)(
+            *[ctypes.cast(base + i * max_key_len, ctypes.c_char_p) for i in range(max_items)])
+        self.types = (ctypes.c_uint8 * max_items)()
+        self.values = (ctypes.c_void_p * max_items)()
+
+
 # Load the native library
 _LIB_PATH = os.path.join(os.path.dirname(__file__), '..', 'build', 'libeshm_data.so')
 
@@ -84,6 +121,15 @@ class NativeDataHandler:
             error = NativeDataHandler._lib.dh_get_last_error()
             raise RuntimeError(f"Failed to create DataHandler: {error.decode('utf-8')}")
 
+        # Destroys the native handle on close() or when this object is collected
+        self._finalizer = weakref.finalize(self, NativeDataHandler._lib.dh_destroy, self._handle)
+
+        # Reused output buffer for encode (grown on demand)
+        self._encode_buf = (ctypes.c_uint8 * 65536)()
+
+        # Reused output arrays for decode
+        self._decode_arrays = _DecodeArrays(100, 256)
+
     @classmethod
     def _setup_library_functions(cls):
         """Setup C library function signatures"""
@@ -113,10 +159,24 @@ class NativeDataHandler:
         ]
         lib.dh_encode.restype = ctypes.c_int
 
+        # dh_encode_batch
+        lib.dh_encode_batch.argtypes = [
+            ctypes.c_void_p,                    # handle
+            ctypes.POINTER(ctypes.c_uint8),     # types
+            ctypes.POINTER(ctypes.c_char_p),    # keys
+            ctypes.POINTER(ctypes.c_void_p),    # values
+            ctypes.POINTER(ctypes.c_int),       # item_counts
+            ctypes.c_int,                       # batch_count
+            ctypes.POINTER(ctypes.c_int),       # out_offsets
+            ctypes.POINTER(ctypes.c_uint8),     # out_buffer
+            ctypes.c_int                        # out_buffer_size
+        ]
+        lib.dh_encode_batch.restype = ctypes.c_int
+
         # dh_decode
         lib.dh_decode.argtypes = [
             ctypes.c_void_p,                    # handle
-            ctypes.POINTER(ctypes.c_uint8),     # buffer
+            ctypes.c_char_p,                    # buffer (bytes passed without a copy)
             ctypes.c_int,                       # buffer_size
             ctypes.POINTER(ctypes.c_uint8),     # out_types
             ctypes.POINTER(ctypes.c_char_p),    # out_keys
@@ -130,6 +190,14 @@ class NativeDataHandler:
         lib.dh_free_value.argtypes = [ctypes.c_uint8, ctypes.c_void_p]
         lib.dh_free_value.restype = None
 
+        # dh_free_values
+        lib.dh_free_values.argtypes = [
+            ctypes.POINTER(ctypes.c_uint8),     # types
+            ctypes.POINTER(ctypes.c_void_p),    # values
+            ctypes.c_int                        # count
+        ]
+        lib.dh_free_values.restype = None
+
     @staticmethod
     def create_integer(key: str, value: int) -> DataItem:
         """Create INTEGER item"""
@@ -165,61 +233,128 @@ class NativeDataHandler:
         Returns:
             Encoded bytes
         """
-        count = len(items)
-
-        # Prepare arrays
-        types = (ctypes.c_uint8 * count)()
-        keys = (ctypes.c_char_p * count)()
-        values = (ctypes.c_void_p * count)()
-
-        # Keep references to prevent garbage collection
-        refs = []
-
-        for i, item in enumerate(items):
-            types[i] = item.type
-            keys[i] = item.key.encode('utf-8')
-
-            if item.type == DataType.INTEGER:
-                val = ctypes.c_int64(item.value)
-                refs.append(val)
-                values[i] = ctypes.addressof(val)
-            elif item.type == DataType.BOOLEAN:
-                val = ctypes.c_bool(item.value)
-                refs.append(val)
-                values[i] = ctypes.addressof(val)
-            elif item.type == DataType.REAL:
-                val = ctypes.c_double(item.value)
-                refs.append(val)
-                values[i] = ctypes.addressof(val)
-            elif item.type == DataType.STRING:
-                val = ctypes.c_char_p(item.value.encode('utf-8'))
-                refs.append(val)
-                values[i] = ctypes.cast(val, ctypes.c_void_p)
-            elif item.type == DataType.BINARY:
-                # TODO: Implement binary support
-                raise NotImplementedError("Binary type not yet implemented")
-            else:
-                raise ValueError(f"Unsupported data type: {item.type}")
-
-        # Allocate output buffer
-        out_buffer = (ctypes.c_uint8 * 8192)()
-
-        # Call native encode
+        types, keys, values, payload = marshal_items(items)
+
+        result = self._encode_into(
+            NativeDataHandler._lib.dh_encode,
+            self._handle,
+            types,
+            keys,
+            values,
+            len(items)
+        )
+
+        return ctypes.string_at(self._encode_buf, result)
+
+    def encode_arrays(self, types: Sequence[int], keys: Sequence[str],
+                      values: Sequence[Any]) -> bytes:
+        """
+        Encode data items given as parallel sequences
+
+        Item i is (types[i], keys[i], values[i]). Skips building one DataItem
+        per item, and all-INTEGER/BOOLEAN/REAL values are packed with a single
+        struct call.
+
+        Args:
+            types: DataType of each item
+            keys: Key of each item
+            values: Value of each item
+
+        Returns:
+            Encoded bytes
+
+        Raises:
+            ValueError: If the sequences differ in length
+        """
+        c_types, c_keys, c_values, payload = marshal_arrays(types, keys, values)
+
+        result = self._encode_into(
+            NativeDataHandler._lib.dh_encode,
+            self._handle,
+            c_types,
+            c_keys,
+            c_values,
+            len(types)
+        )
+
+        return ctypes.string_at(self._encode_buf, result)
+
+    def encode_into(self, items: List[DataItem], out) -> int:
+        """
+        Encode data items straight into a caller-owned buffer
+
+        Same output as encode_data_buffer; the native encoder writes into
+        out, so no bytes object is allocated per call.
+
+        Args:
+            items: List of DataItem objects
+            out: Writable buffer (e.g. bytearray), reused across calls
+
+        Returns:
+            Number of bytes written to the start of out
+
+        Raises:
+            ValueError: If out is too small for the encoded message
+        """
+        types, keys, values, payload = marshal_items(items)
+        out_buffer = (ctypes.c_uint8 * len(out)).from_buffer(out)
+
         result = NativeDataHandler._lib.dh_encode(
+            self._handle, types, keys, values, len(items), out_buffer, len(out_buffer))
+
+        if result < -1:
+            raise ValueError(f"Output buffer too small: need {-result} bytes, have {len(out)}")
+        if result < 0:
+            error = NativeDataHandler._lib.dh_get_last_error()
+            raise RuntimeError(f"Encode failed: {error.decode('utf-8')}")
+
+        return result
+
+    def encode_batch(self, batches: List[List[DataItem]]) -> List[bytes]:
+        """
+        Encode several messages with a single native call
+
+        Args:
+            batches: List of item lists, one per message
+
+        Returns:
+            List of encoded bytes, one per message
+        """
+        batch_count = len(batches)
+        types, keys, values, payload = marshal_items(
+            [item for items in batches for item in items])
+        item_counts = (ctypes.c_int * batch_count)(*[len(items) for items in batches])
+        offsets = (ctypes.c_int * (batch_count + 1))()
+
+        self._encode_into(
+            NativeDataHandler._lib.dh_encode_batch,
             self._handle,
             types,
             keys,
             values,
-            count,
-            out_buffer,
-            8192
+            item_counts,
+            batch_count,
+            offsets
         )
 
+        base = ctypes.addressof(self._encode_buf)
+        return [ctypes.string_at(base + offsets[i], offsets[i + 1] - offsets[i])
+                for i in range(batch_count)]
+
+    def _encode_into(self, encode, *args) -> int:
+        """Call a native encode function with the reused output buffer, growing it if needed"""
+        result = encode(*args, self._encode_buf, len(self._encode_buf))
+
+        if result < -1:
+            # Output buffer too small: grow to the required size and retry
+            self._encode_buf = (ctypes.c_uint8 * -result)()
+            result = encode(*args, self._encode_buf, len(self._encode_buf))
+
         if result < 0:
             error = NativeDataHandler._lib.dh_get_last_error()
             raise RuntimeError(f"Encode failed: {error.decode('utf-8')}")
 
-        return bytes(out_buffer[:result])
+        return result
 
     def decode_data_buffer(self, buffer: bytes) -> List[DataItem]:
         """
@@ -231,32 +366,23 @@ class NativeDataHandler:
         Returns:
             List of DataItem objects
         """
-        buffer_size = len(buffer)
-        buffer_array = (ctypes.c_uint8 * buffer_size).from_buffer_copy(buffer)
-
-        # Allocate output arrays
-        max_items = 100
-        out_types = (ctypes.c_uint8 * max_items)()
-
-        # Allocate key buffers
-        max_key_len = 256
-        key_buffers = [(ctypes.c_char * max_key_len)() for _ in range(max_items)]
-        out_keys = (ctypes.c_char_p * max_items)()
-        for i in range(max_items):
-            out_keys[i] = ctypes.cast(key_buffers[i], ctypes.c_char_p)
-
-        out_values = (ctypes.c_void_p * max_items)()
+        if type(buffer) is not bytes:
+            buffer = bytes(buffer)
+        arrays = self._decode_arrays
+        out_types = arrays.types
+        out_keys = arrays.keys
+        out_values = arrays.values
 
         # Call native decode
         count = NativeDataHandler._lib.dh_decode(
             self._handle,
-            buffer_array,
-            buffer_size,
+            buffer,
+            len(buffer),
             out_types,
             out_keys,
-            max_key_len,
+            arrays.max_key_len,
             out_values,
-            max_items
+            arrays.max_items
         )
 
         if count < 0:
@@ -265,25 +391,20 @@ class NativeDataHandler:
 
         # Extract results
         items = []
-        for i in range(count):
-            dtype = DataType(out_types[i])
-            key = out_keys[i].decode('utf-8')
-
-            if dtype == DataType.INTEGER:
-                value = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_int64)).contents.value
-            elif dtype == DataType.BOOLEAN:
-                value = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_bool)).contents.value
-            elif dtype == DataType.REAL:
-                value = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_double)).contents.value
-            elif dtype == DataType.STRING:
-                value = ctypes.cast(out_values[i], ctypes.c_char_p).value.decode('utf-8')
-            else:
-                value = None
-
-            items.append(DataItem(dtype, key, value))
-
-            # Free the allocated value
-            NativeDataHandler._lib.dh_free_value(out_types[i], out_values[i])
+        try:
+            for i in range(count):
+                dtype = _DATA_TYPES.get(out_types[i])
+                if dtype is None:
+                    dtype = DataType(out_types[i])  # raises ValueError
+                key = out_keys[i].decode('utf-8')
+
+                read = _VALUE_READERS.get(dtype)
+                value = read(out_values[i]) if read is not None else None
+
+                items.append(DataItem(dtype, key, value))
+        finally:
+            # Free all decoded values in one call
+            NativeDataHandler._lib.dh_free_values(out_types, out_values, count)
 
         return items
 
@@ -303,7 +424,7 @@ class NativeDataHandler:
     def close(self):
         """Close the DataHandler"""
         if self._handle:
-            NativeDataHandler._lib.dh_destroy(self._handle)
+            self._finalizer()
             self._handle = None
 
     def __enter__(self):
@@ -314,10 +435,6 @@ class NativeDataHandler:
         """Context manager exit"""
         self.close()
 
-    def __del__(self):
-        """Destructor"""
-        self.close()
-
 
 # Convenience exports
 DataHandler = NativeDataHandler
@@ -336,6 +453,7 @@ if __name__ == "__main__":
             NativeDataHandler.create_boolean("enabled", True),
             NativeDataHandler.create_real("temperature", 23.5),
             NativeDataHandler.create_string("status", "OK"),
+            NativeDataHandler.create_binary("payload", b"\x00\x01\xff"),
         ]
 
         # Encode
@@ -355,6 +473,7 @@ if __name__ == "__main__":
         assert values["enabled"] == True
         assert abs(values["temperature"] - 23.5) < 0.0001
         assert values["status"] == "OK"
+        assert values["payload"] == b"\x00\x01\xff"
 
         handler.close()
 
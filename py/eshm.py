@@ -7,8 +7,15 @@ inter-process communication using shared memory.
 
 import ctypes
 import os
+import weakref
 from enum import IntEnum
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .eshm_common import BATCH_LENGTH, KEY_CACHE, ReadDataArrays, batch_spans, decode_key
+except ImportError:
+    # Run as a script or imported with py/ on sys.path
+    from eshm_common import BATCH_LENGTH, KEY_CACHE, ReadDataArrays, batch_spans, decode_key
 
 # Load the ESHM library
 _lib_path = os.path.join(os.path.dirname(__file__), '..', 'build', 'libeshm.a')
@@ -49,6 +56,14 @@ class ESHMError(IntEnum):
     NOT_INITIALIZED = -14
     ROLE_MISMATCH = -15
 
+# Plain-int error codes for the read/write paths (IntEnum member lookups are slow)
+_SUCCESS = int(ESHMError.SUCCESS)
+_NO_DATA = int(ESHMError.NO_DATA)
+_TIMEOUT = int(ESHMError.TIMEOUT)
+
+# ESHMRole members by value (cheaper than calling ESHMRole() in get_role)
+_ROLES = {int(role): role for role in ESHMRole}
+
 class ESHMDisconnectBehavior(IntEnum):
     """Disconnect behavior on stale master detection"""
     IMMEDIATELY = 0
@@ -87,6 +102,13 @@ class ESHMStats(ctypes.Structure):
         ("s2m_read_count", ctypes.c_uint64),
     ]
 
+class _BinaryData(ctypes.Structure):
+    """Value layout of BINARY items returned by eshm_read_data"""
+    _fields_ = [
+        ("data", ctypes.c_void_p),
+        ("len", ctypes.c_size_t),
+    ]
+
 # We need to build a shared library version of ESHM
 # For now, let's create a helper script to build it
 _SHARED_LIB_PATH = os.path.join(os.path.dirname(__file__), '..', 'build', 'libeshm.so')
@@ -102,6 +124,10 @@ def _load_library():
         )
     return ctypes.CDLL(_SHARED_LIB_PATH)
 
+# Hot-path functions, bound by ESHM._setup_library_functions (a module global
+# is one lookup cheaper than an ESHM class attribute)
+_eshm_write = _eshm_read = _eshm_read_ex = _eshm_read_data = _eshm_free_values = None
+
 class ESHM:
     """
     Python wrapper for Enhanced Shared Memory (ESHM) Library
@@ -166,6 +192,9 @@ class ESHM:
         if not self._handle:
             raise RuntimeError("Failed to initialize ESHM")
 
+        # Destroys the native handle on close() or when this object is collected
+        self._finalizer = weakref.finalize(self, ESHM._lib.eshm_destroy, self._handle)
+        self._io = _ChannelIO(self._handle)
         self._shm_name = shm_name
 
     @classmethod
@@ -216,6 +245,14 @@ class ESHM:
         lib.eshm_free_value.argtypes = [ctypes.c_void_p, ctypes.c_uint8]
         lib.eshm_free_value.restype = None
 
+        # eshm_free_values (free all values returned by one eshm_read_data call)
+        lib.eshm_free_values.argtypes = [
+            ctypes.POINTER(ctypes.c_void_p),
+            ctypes.POINTER(ctypes.c_uint8),
+            ctypes.c_int
+        ]
+        lib.eshm_free_values.restype = None
+
         # eshm_get_stats
         lib.eshm_get_stats.argtypes = [ctypes.c_void_p, ctypes.POINTER(ESHMStats)]
         lib.eshm_get_stats.restype = ctypes.c_int
@@ -228,24 +265,92 @@ class ESHM:
         lib.eshm_check_remote_alive.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_bool)]
         lib.eshm_check_remote_alive.restype = ctypes.c_int
 
+        # eshm_wait_remote
+        lib.eshm_wait_remote.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
+        lib.eshm_wait_remote.restype = ctypes.c_int
+
         # eshm_error_string
         lib.eshm_error_string.argtypes = [ctypes.c_int]
         lib.eshm_error_string.restype = ctypes.c_char_p
 
+        # Function objects used on the hot paths, looked up once
+        global _eshm_write, _eshm_read, _eshm_read_ex, _eshm_read_data, _eshm_free_values
+        _eshm_write = lib.eshm_write
+        _eshm_read = lib.eshm_read
+        _eshm_read_ex = lib.eshm_read_ex
+        _eshm_read_data = lib.eshm_read_data
+        _eshm_free_values = lib.eshm_free_values
+
     def write(self, data: bytes) -> None:
         """
         Write data to shared memory
 
         Args:
-            data: Data to write (bytes)
+            data: Data to write (bytes or any contiguous bytes-like object,
+                e.g. bytearray, memoryview or a numpy array; not copied where possible)
 
         Raises:
             RuntimeError: If write fails
         """
-        ret = ESHM._lib.eshm_write(self._handle, data, len(data))
-        if ret != ESHMError.SUCCESS:
+        ret = self._io.write(data)
+        if ret != _SUCCESS:
+            raise RuntimeError(f"Write failed: {self._error_string(ret)}")
+
+    def write_batch(self, messages: Sequence[bytes]) -> None:
+        """
+        Write several messages as one batch (a single update of the channel)
+
+        Separate writes replace each other if the reader falls behind; a batch
+        arrives whole with one read and is split again with split_batch. Same
+        framing as eshm_write_batch.
+
+        Args:
+            messages: Messages to write (bytes or bytearray)
+
+        Raises:
+            RuntimeError: If write fails (e.g. the framed batch is larger
+                than ESHM_MAX_DATA_SIZE)
+        """
+        ret = self._io.write_batch(messages)
+        if ret != _SUCCESS:
             raise RuntimeError(f"Write failed: {self._error_string(ret)}")
 
+    @staticmethod
+    def split_batch(data) -> List[bytes]:
+        """
+        Split data written by write_batch back into its messages
+
+        Args:
+            data: Data read from shared memory (bytes-like)
+
+        Returns:
+            List of messages
+
+        Raises:
+            ValueError: If data is not a complete batch
+        """
+        view = memoryview(data).cast('B')
+        return [view[offset:offset + length].tobytes()
+                for offset, length in batch_spans(view, len(view))]
+
+    def read_batch(self, buffer_size: int = 4096, timeout_ms: Optional[int] = None) -> List[bytes]:
+        """
+        Read one batch written by write_batch and split it into its messages
+
+        Args:
+            buffer_size: Maximum buffer size to read
+            timeout_ms: Optional custom timeout in milliseconds (as in read)
+
+        Returns:
+            List of messages
+
+        Raises:
+            RuntimeError: If read fails
+            TimeoutError: If read times out
+            ValueError: If the data read is not a complete batch
+        """
+        return self.split_batch(self.read(buffer_size, timeout_ms))
+
     def read(self, buffer_size: int = 4096, timeout_ms: Optional[int] = None) -> bytes:
         """
         Read data from shared memory (simplified API with default 1000ms timeout)
@@ -261,32 +366,61 @@ class ESHM:
             RuntimeError: If read fails
             TimeoutError: If read times out
         """
-        buffer = ctypes.create_string_buffer(buffer_size)
-
         if timeout_ms is None:
             # Use simplified API
-            bytes_read = ESHM._lib.eshm_read(self._handle, buffer, buffer_size)
+            bytes_read, data = self._io.read(buffer_size)
             if bytes_read >= 0:
-                return buffer.raw[:bytes_read]
-            elif bytes_read == ESHMError.TIMEOUT:
+                return data
+            elif bytes_read == _TIMEOUT:
                 raise TimeoutError("Read timed out")
             else:
                 raise RuntimeError(f"Read failed: {self._error_string(bytes_read)}")
         else:
             # Use extended API
-            bytes_read = ctypes.c_size_t()
-            ret = ESHM._lib.eshm_read_ex(
-                self._handle,
-                buffer,
-                buffer_size,
-                ctypes.byref(bytes_read),
-                timeout_ms
-            )
-            if ret == ESHMError.SUCCESS:
-                return buffer.raw[:bytes_read.value]
-            elif ret == ESHMError.TIMEOUT:
+            ret, data = self._io.read_ex(buffer_size, timeout_ms)
+            if ret == _SUCCESS:
+                return data
+            elif ret == _TIMEOUT:
                 raise TimeoutError("Read timed out")
-            elif ret == ESHMError.NO_DATA:
+            elif ret == _NO_DATA:
+                raise RuntimeError("No data available")
+            else:
+                raise RuntimeError(f"Read failed: {self._error_string(ret)}")
+
+    def read_into(self, buffer, timeout_ms: Optional[int] = None) -> int:
+        """
+        Read data from shared memory straight into a caller-owned buffer
+
+        Same as read(), but no bytes object is created per message, so one
+        bytearray can be reused across reads.
+
+        Args:
+            buffer: Writable buffer (e.g. bytearray or memoryview); its size
+                is the maximum message size
+            timeout_ms: Optional custom timeout in milliseconds (uses extended API)
+
+        Returns:
+            Number of bytes written to the start of buffer (can be 0 for event trigger)
+
+        Raises:
+            RuntimeError: If read fails
+            TimeoutError: If read times out
+        """
+        if timeout_ms is None:
+            bytes_read = self._io.read_into(buffer)
+            if bytes_read >= 0:
+                return bytes_read
+            elif bytes_read == _TIMEOUT:
+                raise TimeoutError("Read timed out")
+            else:
+                raise RuntimeError(f"Read failed: {self._error_string(bytes_read)}")
+        else:
+            ret, bytes_read = self._io.read_ex_into(buffer, timeout_ms)
+            if ret == _SUCCESS:
+                return bytes_read
+            elif ret == _TIMEOUT:
+                raise TimeoutError("Read timed out")
+            elif ret == _NO_DATA:
                 raise RuntimeError("No data available")
             else:
                 raise RuntimeError(f"Read failed: {self._error_string(ret)}")
@@ -301,24 +435,67 @@ class ESHM:
         Returns:
             Data read as bytes, or None if no data available
         """
-        buffer = ctypes.create_string_buffer(buffer_size)
-        bytes_read = ctypes.c_size_t()
+        ret, data = self._io.read_ex(buffer_size, 0)  # 0 timeout = non-blocking
 
-        ret = ESHM._lib.eshm_read_ex(
-            self._handle,
-            buffer,
-            buffer_size,
-            ctypes.byref(bytes_read),
-            0  # 0 timeout = non-blocking
-        )
+        if ret == _SUCCESS:
+            return data
+        elif ret == _NO_DATA or ret == _TIMEOUT:
+            return None
+        else:
+            raise RuntimeError(f"Read failed: {self._error_string(ret)}")
+
+    def try_read_into(self, buffer) -> Optional[int]:
+        """
+        Try to read data into a caller-owned buffer without blocking
 
-        if ret == ESHMError.SUCCESS:
-            return buffer.raw[:bytes_read.value]
-        elif ret == ESHMError.NO_DATA or ret == ESHMError.TIMEOUT:
+        Non-blocking counterpart of read_into: no bytes object is created per
+        message, so one bytearray can be reused across polls.
+
+        Args:
+            buffer: Writable buffer (e.g. bytearray or memoryview); its size
+                is the maximum message size
+
+        Returns:
+            Number of bytes written to the start of buffer (can be 0 for
+            event trigger), or None if no data available
+        """
+        ret, bytes_read = self._io.read_ex_into(buffer, 0)  # 0 timeout = non-blocking
+
+        if ret == _SUCCESS:
+            return bytes_read
+        elif ret == _NO_DATA or ret == _TIMEOUT:
             return None
         else:
             raise RuntimeError(f"Read failed: {self._error_string(ret)}")
 
+    def read_reply(self, buffer, reply, max_messages: int, batched: bool = False,
+                   timeout_ms: int = 1000) -> int:
+        """
+        Read messages into buffer and answer each read with reply, in one call
+
+        The whole receive loop runs in the channel backend (in C with the
+        compiled eshm_cy module), for slaves that only acknowledge what they
+        receive. Ctrl+C still interrupts it.
+
+        Args:
+            buffer: Writable buffer each message is read into (reused)
+            reply: Data written back after every read (bytes-like)
+            max_messages: Return once this many messages have been received
+            batched: Count the messages in each read as framed by write_batch
+            timeout_ms: Return early when no message arrives within this time
+
+        Returns:
+            Number of messages received (fewer than max_messages after a timeout)
+
+        Raises:
+            RuntimeError: If a read or write fails
+            ValueError: If batched and a read is not a complete batch
+        """
+        ret, count = self._io.read_reply(buffer, reply, max_messages, batched, timeout_ms)
+        if ret == _SUCCESS or ret == _TIMEOUT or ret == _NO_DATA:
+            return count
+        raise RuntimeError(f"Read/reply failed: {self._error_string(ret)}")
+
     def read_data(self, timeout_ms: int = 10, max_items: int = 32) -> dict:
         """
         Read and decode data in one operation (optimized for performance)
@@ -337,67 +514,13 @@ class ESHM:
             TimeoutError: If read times out
             RuntimeError: If read/decode fails
         """
-        # Allocate output buffers
-        max_key_len = 64
-        out_types = (ctypes.c_uint8 * max_items)()
-        out_keys = (ctypes.c_char_p * max_items)()
-
-        # Pre-allocate key buffers
-        key_buffers = []
-        for i in range(max_items):
-            key_buf = ctypes.create_string_buffer(max_key_len)
-            key_buffers.append(key_buf)
-            out_keys[i] = ctypes.cast(key_buf, ctypes.c_char_p)
-
-        out_values = (ctypes.c_void_p * max_items)()
-        item_count = ctypes.c_int()
-
-        # Call C function
-        ret = ESHM._lib.eshm_read_data(
-            self._handle,
-            out_types,
-            out_keys,
-            max_key_len,
-            out_values,
-            max_items,
-            ctypes.byref(item_count),
-            timeout_ms
-        )
+        ret, result = self._io.read_data(timeout_ms, max_items)
 
-        if ret == ESHMError.TIMEOUT:
+        if ret == _TIMEOUT:
             raise TimeoutError("Read timed out")
-        elif ret != ESHMError.SUCCESS:
+        elif ret != _SUCCESS:
             raise RuntimeError(f"Read data failed: {self._error_string(ret)}")
 
-        # Convert to Python dict
-        result = {}
-        for i in range(item_count.value):
-            key = out_keys[i].decode('utf-8')
-            dtype = out_types[i]
-
-            # Extract value based on type
-            if dtype == 0:  # INTEGER
-                val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_int64))
-                result[key] = val_ptr[0]
-            elif dtype == 1:  # BOOLEAN
-                val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_bool))
-                result[key] = bool(val_ptr[0])
-            elif dtype == 2:  # REAL
-                val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_double))
-                result[key] = val_ptr[0]
-            elif dtype == 3:  # STRING
-                val_ptr = ctypes.cast(out_values[i], ctypes.c_char_p)
-                result[key] = val_ptr.value.decode('utf-8')
-            elif dtype == 4:  # BINARY
-                # Binary data stored as struct { uint8_t* data; size_t len; }
-                class BinaryData(ctypes.Structure):
-                    _fields_ = [("data", ctypes.POINTER(ctypes.c_uint8)), ("len", ctypes.c_size_t)]
-                val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(BinaryData))
-                result[key] = bytes(val_ptr[0].data[:val_ptr[0].len])
-
-            # Free the allocated memory using the C library function
-            ESHM._lib.eshm_free_value(out_values[i], dtype)
-
         return result
 
     def get_stats(self) -> dict:
@@ -437,9 +560,10 @@ class ESHM:
         """
         role = ctypes.c_int()
         ret = ESHM._lib.eshm_get_role(self._handle, ctypes.byref(role))
-        if ret != ESHMError.SUCCESS:
+        if ret != _SUCCESS:
             raise RuntimeError(f"Failed to get role: {self._error_string(ret)}")
-        return ESHMRole(role.value)
+        result = _ROLES.get(role.value)
+        return result if result is not None else ESHMRole(role.value)
 
     def is_remote_alive(self) -> bool:
         """
@@ -454,6 +578,29 @@ class ESHM:
             raise RuntimeError(f"Failed to check remote alive: {self._error_string(ret)}")
         return alive.value
 
+    def wait_remote(self, timeout_ms: int = 1000) -> bool:
+        """
+        Wait until the remote endpoint has attached to the shared memory
+
+        Blocks on a futex that the remote wakes when it attaches, so it
+        returns as soon as that happens instead of at the next poll.
+
+        Args:
+            timeout_ms: Timeout in milliseconds (0 = just check)
+
+        Returns:
+            True once the remote has attached, False on timeout
+
+        Raises:
+            RuntimeError: If the wait fails
+        """
+        ret = ESHM._lib.eshm_wait_remote(self._handle, timeout_ms)
+        if ret == _SUCCESS:
+            return True
+        elif ret == _TIMEOUT:
+            return False
+        raise RuntimeError(f"Failed to wait for remote: {self._error_string(ret)}")
+
     def _error_string(self, error_code: int) -> str:
         """Get error string for error code"""
         result = ESHM._lib.eshm_error_string(error_code)
@@ -462,8 +609,9 @@ class ESHM:
     def close(self):
         """Close ESHM handle"""
         if self._handle:
-            ESHM._lib.eshm_destroy(self._handle)
+            self._finalizer()
             self._handle = None
+            self._io.detach()
 
     def __enter__(self):
         """Context manager entry"""
@@ -473,10 +621,6 @@ class ESHM:
         """Context manager exit"""
         self.close()
 
-    def __del__(self):
-        """Destructor"""
-        self.close()
-
     def __repr__(self):
         """String representation"""
         try:
@@ -484,3 +628,243 @@ class ESHM:
             return f"ESHM(name='{self._shm_name}', role={role.name})"
         except:
             return f"ESHM(name='{self._shm_name}')"
+
+
+class _ChannelIO:
+    """
+    write/read for one handle through ctypes, reusing a single read buffer
+
+    Buffers are popped off a list for the duration of a call (list.pop is
+    atomic under the GIL), so a second thread reading the same handle
+    meanwhile gets a fresh one instead of sharing it.
+    """
+
+    __slots__ = ('_handle', '_buffers', '_read_arrays')
+
+    def __init__(self, handle: int, buffer_size: int = 4096):
+        self._handle = handle
+        self._buffers = [((ctypes.c_char * buffer_size)(), ctypes.c_size_t())]
+        self._read_arrays = []
+
+    def _take_buffer(self, buffer_size: int):
+        """Take (buffer, bytes_read) for one call, growing the buffer if needed"""
+        try:
+            buffer, bytes_read = self._buffers.pop()
+        except IndexError:
+            bytes_read = ctypes.c_size_t()
+        else:
+            if buffer_size <= len(buffer):
+                return buffer, bytes_read
+        return (ctypes.c_char * buffer_size)(), bytes_read
+
+    def detach(self):
+        """Forget the handle once it has been destroyed"""
+        self._handle = None
+
+    def write(self, data) -> int:
+        """Write a bytes-like object, returns the ESHM error code"""
+        if type(data) is not bytes:
+            data = _char_array(data)
+        return _eshm_write(self._handle, data, len(data))
+
+    def write_batch(self, messages) -> int:
+        """Write messages framed as in eshm_write_batch, returns the ESHM error code"""
+        # Framing here and one eshm_write is cheaper than building an iovec array in ctypes
+        pack = BATCH_LENGTH.pack
+        data = b''.join([part for message in messages for part in (pack(len(message)), message)])
+        return _eshm_write(self._handle, data, len(data))
+
+    def read(self, buffer_size: int) -> Tuple[int, Optional[bytes]]:
+        """Simple read, returns (bytes read or error code, data or None)"""
+        entry = buffer, _ = self._take_buffer(buffer_size)
+        bytes_read = _eshm_read(self._handle, buffer, buffer_size)
+        data = buffer[:bytes_read] if bytes_read >= 0 else None
+        self._buffers.append(entry)
+        return bytes_read, data
+
+    def read_ex(self, buffer_size: int, timeout_ms: int) -> Tuple[int, Optional[bytes]]:
+        """Extended read, returns (error code, data or None)"""
+        entry = buffer, bytes_read = self._take_buffer(buffer_size)
+        ret = _eshm_read_ex(self._handle, buffer, buffer_size,
+                            ctypes.byref(bytes_read), timeout_ms)
+        data = buffer[:bytes_read.value] if ret == _SUCCESS else None
+        self._buffers.append(entry)
+        return ret, data
+
+    def read_into(self, buffer) -> int:
+        """Simple read into a writable buffer, returns bytes read or error code"""
+        target, size = _writable_target(buffer)
+        return _eshm_read(self._handle, target, size)
+
+    def read_ex_into(self, buffer, timeout_ms: int) -> Tuple[int, int]:
+        """Extended read into a writable buffer, returns (error code, bytes read)"""
+        target, size = _writable_target(buffer)
+        # Only the pooled bytes_read is used, the pooled buffer stays untouched
+        entry = _, bytes_read = self._take_buffer(0)
+        ret = _eshm_read_ex(self._handle, target, size,
+                            ctypes.byref(bytes_read), timeout_ms)
+        self._buffers.append(entry)
+        return ret, bytes_read.value
+
+    def read_reply(self, buffer, reply, max_messages: int, batched: bool,
+                   timeout_ms: int) -> Tuple[int, int]:
+        """Read into buffer and write reply per read until max_messages, returns (error code, messages)"""
+        target, size = _writable_target(buffer)
+        if type(reply) is not bytes:
+            reply = _char_array(reply)
+        reply_size = len(reply)
+        bytes_read = ctypes.c_size_t()
+        bytes_read_ref = ctypes.byref(bytes_read)
+        view = memoryview(buffer).cast('B') if batched else None
+        handle = self._handle
+        count = 0
+        while count < max_messages:
+            ret = _eshm_read_ex(handle, target, size, bytes_read_ref, timeout_ms)
+            if ret != _SUCCESS:
+                return ret, count
+            count += len(batch_spans(view, bytes_read.value)) if batched else 1
+            ret = _eshm_write(handle, reply, reply_size)
+            if ret != _SUCCESS:
+                return ret, count
+        return _SUCCESS, count
+
+    def read_data(self, timeout_ms: int, max_items: int) -> Tuple[int, Optional[dict]]:
+        """Read and decode in C, returns (error code, dict or None)"""
+        try:
+            arrays = self._read_arrays.pop()
+        except IndexError:
+            arrays = ReadDataArrays(max(max_items, 32), 64)
+        try:
+            return self._read_data(arrays, timeout_ms, max_items)
+        finally:
+            self._read_arrays.append(arrays)
+
+    def _read_data(self, arrays: 'ReadDataArrays', timeout_ms: int,
+                   max_items: int) -> Tuple[int, Optional[dict]]:
+        arrays.reserve(max_items)
+        out_types = arrays.types
+        out_keys = arrays.keys
+        out_values = arrays.values
+        item_count = arrays.count
+
+        ret = _eshm_read_data(
+            self._handle,
+            out_types,
+            out_keys,
+            arrays.max_key_len,
+            out_values,
+            max_items,
+            ctypes.byref(item_count),
+            timeout_ms
+        )
+        if ret != _SUCCESS:
+            return ret, None
+
+        # Convert to Python dict
+        result = {}
+        count = item_count.value
+        cached_key = KEY_CACHE.get
+        try:
+            for i in range(count):
+                raw_key = out_keys[i]
+                key = cached_key(raw_key)
+                if key is None:
+                    key = decode_key(raw_key)
+                dtype = out_types[i]
+
+                # Extract value based on type
+                if dtype == 0:  # INTEGER
+                    val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_int64))
+                    result[key] = val_ptr[0]
+                elif dtype == 1:  # BOOLEAN
+                    val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_bool))
+                    result[key] = bool(val_ptr[0])
+                elif dtype == 2:  # REAL
+                    val_ptr = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_double))
+                    result[key] = val_ptr[0]
+                elif dtype == 3:  # STRING
+                    val_ptr = ctypes.cast(out_values[i], ctypes.c_char_p)
+                    result[key] = val_ptr.value.decode('utf-8')
+                elif dtype == 4:  # BINARY
+                    # Binary data stored as struct { uint8_t* data; size_t len; }
+                    binary = _BinaryData.from_address(out_values[i])
+                    result[key] = ctypes.string_at(binary.data, binary.len) if binary.len else b''
+        finally:
+            # Free all decoded values in one call
+            _eshm_free_values(out_values, out_types, count)
+
+        return ret, result
+
+
+# Up to this size, copying a bytes-like object into bytes costs less than
+# wrapping it in a ctypes array (measured on the whole write: the wrap only
+# wins from ~16-24 KB). With the default ESHM_MAX_DATA_SIZE of 4096 every
+# accepted write is therefore copied; the in-place path pays off in builds
+# configured with a larger ESHM_MAX_DATA_SIZE.
+_WRITE_COPY_MAX = 16384
+
+
+def _char_array(data):
+    """
+    View a bytes-like object as something eshm_write accepts
+
+    Small or read-only buffers are copied into bytes; larger writable ones
+    (bytearray, numpy arrays, ...) are wrapped in place as a ctypes char array.
+
+    Raises:
+        TypeError: If data does not support the buffer protocol or is not contiguous
+    """
+    if type(data) is bytearray and len(data) <= _WRITE_COPY_MAX:
+        return bytes(data)
+    view = memoryview(data).cast('B')
+    if view.readonly or view.nbytes <= _WRITE_COPY_MAX:
+        return view.tobytes()
+    return (ctypes.c_char * view.nbytes).from_buffer(view)
+
+
+def _writable_target(buffer):
+    """
+    Pointer to and size of a writable bytes-like object, for reading into it in place
+
+    Raises:
+        TypeError: If buffer is read-only, not contiguous or not a buffer
+    """
+    if type(buffer) is bytearray and buffer:
+        # Common case: skip the memoryview and array type
+        return ctypes.byref(ctypes.c_char.from_buffer(buffer)), len(buffer)
+    view = memoryview(buffer).cast('B')
+    return (ctypes.c_char * view.nbytes).from_buffer(view), view.nbytes
+
+
+try:
+    # Compiled replacement that skips ctypes (py/eshm_cy.pyx, see build_shared_lib.sh)
+    from eshm_cy import ChannelIO as _ChannelIO
+except ImportError:
+    try:
+        # Next best without a compiler: cffi ABI mode (py/eshm_cffi.py)
+        from eshm_cffi import ChannelIO as _ChannelIO
+    except (ImportError, OSError):
+        pass
+
+
+# Example usage and test
+if __name__ == "__main__":
+    print("Testing write buffer handling...")
+
+    # Small writable buffers are copied into bytes
+    small = bytearray(b'x' * 64)
+    assert type(_char_array(small)) is bytes
+
+    # Large writable buffers are wrapped in place, no copy
+    large = bytearray(_WRITE_COPY_MAX + 1)
+    wrapped = _char_array(large)
+    assert isinstance(wrapped, ctypes.Array) and len(wrapped) == len(large)
+    large[0] = 0x41
+    assert wrapped[0] == b'A', "wrapped array does not share the buffer"
+    wrapped = _char_array(memoryview(large))
+    assert isinstance(wrapped, ctypes.Array)
+
+    # Read-only buffers are copied whatever their size
+    assert type(_char_array(memoryview(bytes(large)))) is bytes
+
+    print("All tests passed!")
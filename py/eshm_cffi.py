@@ -0,0 +1,204 @@
+"""
+cffi (ABI mode) write/read calls for eshm.py
+
+Same class as the ctypes _ChannelIO in eshm.py, but calls libeshm.so through
+cffi, whose per-call argument conversion for declared signatures is cheaper
+than ctypes'. Needs no compiler: eshm.py uses it when cffi is installed and
+the compiled eshm_cy module is not available.
+"""
+
+import os
+from typing import Optional, Tuple
+
+from cffi import FFI
+
+from eshm_common import BATCH_LENGTH, KEY_CACHE, batch_spans, decode_key
+
+_ffi = FFI()
+_ffi.cdef("""
+    typedef struct { char* data; size_t len; } BinaryData;
+
+    int eshm_write(void* handle, const void* data, size_t size);
+    int eshm_read(void* handle, void* buffer, size_t buffer_size);
+    int eshm_read_ex(void* handle, void* buffer, size_t buffer_size,
+                     size_t* bytes_read, uint32_t timeout_ms);
+    int eshm_read_data(void* handle, uint8_t* out_types, char** out_keys,
+                       int max_key_len, void** out_values, int max_items,
+                       int* item_count, uint32_t timeout_ms);
+    void eshm_free_values(void** values, const uint8_t* types, int count);
+""")
+_lib = _ffi.dlopen(os.path.join(os.path.dirname(__file__), '..', 'build', 'libeshm.so'))
+
+# ESHM_SUCCESS
+_SUCCESS = 0
+
+# Key buffer size per item for read_data, same as the ctypes path
+_MAX_KEY_LEN = 64
+
+
+class _ItemArrays:
+    """Output arrays for eshm_read_data"""
+
+    __slots__ = ('max_items', 'types', 'keys', 'key_ptrs', 'values', 'count')
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.types = _ffi.new('uint8_t[]', max_items)
+        # One block for all keys, key_ptrs[i] points at its _MAX_KEY_LEN slot
+        self.keys = _ffi.new('char[]', max_items * _MAX_KEY_LEN)
+        self.key_ptrs = _ffi.new('char*[]', [self.keys + i * _MAX_KEY_LEN
+                                             for i in range(max_items)])
+        self.values = _ffi.new('void*[]', max_items)
+        self.count = _ffi.new('int*')
+
+
+class ChannelIO:
+    """
+    write/read for one handle through cffi, reusing a single read buffer
+
+    Buffers are popped off a list for the duration of a call (list.pop is
+    atomic under the GIL), so a second thread reading the same handle
+    meanwhile gets a fresh one instead of sharing it.
+    """
+
+    __slots__ = ('_handle', '_buffers', '_read_arrays')
+
+    def __init__(self, handle: int, buffer_size: int = 4096):
+        self._handle = _ffi.cast('void*', handle)
+        self._buffers = [(_ffi.new('char[]', buffer_size), _ffi.new('size_t*'))]
+        self._read_arrays = []
+
+    def _take_buffer(self, buffer_size: int):
+        """Take (buffer, bytes_read) for one call, growing the buffer if needed"""
+        try:
+            buffer, bytes_read = self._buffers.pop()
+        except IndexError:
+            bytes_read = _ffi.new('size_t*')
+        else:
+            if buffer_size <= len(buffer):
+                return buffer, bytes_read
+        return _ffi.new('char[]', buffer_size), bytes_read
+
+    def detach(self):
+        """Forget the handle once it has been destroyed"""
+        self._handle = _ffi.NULL
+
+    def write(self, data) -> int:
+        """Write a bytes-like object, returns the ESHM error code"""
+        buffer = _ffi.from_buffer(data)
+        return _lib.eshm_write(self._handle, buffer, len(buffer))
+
+    def write_batch(self, messages) -> int:
+        """Write messages framed as in eshm_write_batch, returns the ESHM error code"""
+        # Framing here and one eshm_write beats a from_buffer per message for an iovec array
+        pack = BATCH_LENGTH.pack
+        data = b''.join([part for message in messages for part in (pack(len(message)), message)])
+        return _lib.eshm_write(self._handle, data, len(data))
+
+    def read(self, buffer_size: int) -> Tuple[int, Optional[bytes]]:
+        """Simple read, returns (bytes read or error code, data or None)"""
+        entry = buffer, _ = self._take_buffer(buffer_size)
+        bytes_read = _lib.eshm_read(self._handle, buffer, buffer_size)
+        data = _ffi.unpack(buffer, bytes_read) if bytes_read >= 0 else None
+        self._buffers.append(entry)
+        return bytes_read, data
+
+    def read_ex(self, buffer_size: int, timeout_ms: int) -> Tuple[int, Optional[bytes]]:
+        """Extended read, returns (error code, data or None)"""
+        entry = buffer, bytes_read = self._take_buffer(buffer_size)
+        ret = _lib.eshm_read_ex(self._handle, buffer, buffer_size, bytes_read, timeout_ms)
+        data = _ffi.unpack(buffer, bytes_read[0]) if ret == _SUCCESS else None
+        self._buffers.append(entry)
+        return ret, data
+
+    def read_into(self, buffer) -> int:
+        """Simple read into a writable buffer, returns bytes read or error code"""
+        target = _ffi.from_buffer(buffer, require_writable=True)
+        return _lib.eshm_read(self._handle, target, len(target))
+
+    def read_ex_into(self, buffer, timeout_ms: int) -> Tuple[int, int]:
+        """Extended read into a writable buffer, returns (error code, bytes read)"""
+        target = _ffi.from_buffer(buffer, require_writable=True)
+        # Only the pooled bytes_read is used, the pooled buffer stays untouched
+        entry = _, bytes_read = self._take_buffer(0)
+        ret = _lib.eshm_read_ex(self._handle, target, len(target), bytes_read, timeout_ms)
+        self._buffers.append(entry)
+        return ret, bytes_read[0]
+
+    def read_reply(self, buffer, reply, max_messages: int, batched: bool,
+                   timeout_ms: int) -> Tuple[int, int]:
+        """Read into buffer and write reply per read until max_messages, returns (error code, messages)"""
+        target = _ffi.from_buffer(buffer, require_writable=True)
+        size = len(target)
+        reply_buffer = _ffi.from_buffer(reply)
+        reply_size = len(reply_buffer)
+        view = memoryview(buffer).cast('B') if batched else None
+        entry = _, bytes_read = self._take_buffer(0)
+        handle = self._handle
+        count = 0
+        try:
+            while count < max_messages:
+                ret = _lib.eshm_read_ex(handle, target, size, bytes_read, timeout_ms)
+                if ret != _SUCCESS:
+                    return ret, count
+                count += len(batch_spans(view, bytes_read[0])) if batched else 1
+                ret = _lib.eshm_write(handle, reply_buffer, reply_size)
+                if ret != _SUCCESS:
+                    return ret, count
+            return _SUCCESS, count
+        finally:
+            self._buffers.append(entry)
+
+    def read_data(self, timeout_ms: int, max_items: int) -> Tuple[int, Optional[dict]]:
+        """Read and decode in C, returns (error code, dict or None)"""
+        try:
+            arrays = self._read_arrays.pop()
+        except IndexError:
+            arrays = _ItemArrays(max(max_items, 32))
+        else:
+            if max_items > arrays.max_items:
+                arrays = _ItemArrays(max_items)
+        try:
+            return self._read_data(arrays, timeout_ms, max_items)
+        finally:
+            self._read_arrays.append(arrays)
+
+    def _read_data(self, arrays: _ItemArrays, timeout_ms: int,
+                   max_items: int) -> Tuple[int, Optional[dict]]:
+        out_types = arrays.types
+        out_keys = arrays.key_ptrs
+        out_values = arrays.values
+        ret = _lib.eshm_read_data(self._handle, out_types, out_keys, _MAX_KEY_LEN,
+                                  out_values, max_items, arrays.count, timeout_ms)
+        if ret != _SUCCESS:
+            return ret, None
+
+        result = {}
+        count = arrays.count[0]
+        cast = _ffi.cast
+        string = _ffi.string
+        cached_key = KEY_CACHE.get
+        try:
+            for i in range(count):
+                raw_key = string(out_keys[i])
+                key = cached_key(raw_key)
+                if key is None:
+                    key = decode_key(raw_key)
+                dtype = out_types[i]
+                value = out_values[i]
+
+                if dtype == 0:  # INTEGER
+                    result[key] = cast('int64_t*', value)[0]
+                elif dtype == 1:  # BOOLEAN
+                    result[key] = cast('uint8_t*', value)[0] != 0
+                elif dtype == 2:  # REAL
+                    result[key] = cast('double*', value)[0]
+                elif dtype == 3:  # STRING
+                    result[key] = string(cast('char*', value)).decode('utf-8')
+                elif dtype == 4:  # BINARY
+                    binary = cast('BinaryData*', value)
+                    result[key] = _ffi.unpack(binary.data, binary.len)
+        finally:
+            _lib.eshm_free_values(out_values, out_types, count)
+
+        return ret, result
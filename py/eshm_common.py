@@ -0,0 +1,215 @@
+"""
+Helpers shared by the ESHM wrapper modules
+
+Batch framing and the read-side arrays and key cache (eshm.py,
+eshm_data.py, eshm_cffi.py) and the value marshalling for the native encoders (data_handler_native.py,
+eshm_data.py). Internal to the wrapper, not part of its public API.
+"""
+
+import ctypes
+import struct
+from itertools import accumulate
+from typing import Dict
+
+# DataType values, as in include/data_handler.h
+INTEGER = 0
+BOOLEAN = 1
+REAL = 2
+STRING = 3
+BINARY = 4
+
+# Length prefix of each message in a batch (uint32_t, host byte order as in eshm_write_batch)
+BATCH_LENGTH = struct.Struct('=I')
+
+
+def batch_spans(view, size: int):
+    """
+    (offset, length) of each message in the first size bytes of a batch
+    written by write_batch
+
+    Raises:
+        ValueError: If those bytes are not a complete batch
+    """
+    header = BATCH_LENGTH.size
+    unpack_from = BATCH_LENGTH.unpack_from
+    spans = []
+    offset = 0
+    while offset < size:
+        if size - offset < header:
+            raise ValueError("Truncated batch header")
+        length, = unpack_from(view, offset)
+        offset += header
+        if size - offset < length:
+            raise ValueError("Truncated batch message")
+        spans.append((offset, length))
+        offset += length
+    return spans
+
+
+# Decoded read_data keys; messages usually repeat the same small set of keys
+KEY_CACHE: Dict[bytes, str] = {}
+KEY_CACHE_SIZE = 1024
+
+
+def decode_key(raw_key: bytes) -> str:
+    """Decode a read_data key and remember it in KEY_CACHE"""
+    key = raw_key.decode('utf-8')
+    if len(KEY_CACHE) >= KEY_CACHE_SIZE:
+        KEY_CACHE.clear()
+    KEY_CACHE[raw_key] = key
+    return key
+
+
+class ReadDataArrays:
+    """Output arrays for read_data, allocated once per handle and grown on demand"""
+
+    __slots__ = ('max_items', 'max_key_len', 'types', 'keys', 'values', 'count',
+                 '_key_buffer')
+
+    def __init__(self, max_items: int, max_key_len: int):
+        self.max_items = 0
+        self.max_key_len = max_key_len
+        self.count = ctypes.c_int()
+        self.reserve(max_items)
+
+    def reserve(self, max_items: int):
+        """Make room for at least max_items items"""
+        if max_items <= self.max_items:
+            return
+        max_key_len = self.max_key_len
+        # One block for all keys, out_keys[i] points at its max_key_len slot
+        key_buffer = ctypes.create_string_buffer(max_items * max_key_len)
+        base = ctypes.addressof(key_buffer)
+        self.keys = (ctypes.c_char_p * max_items)(
+            *[ctypes.cast(base + i * max_key_len, ctypes.c_char_p) for i in range(max_items)])
+        self.types = (ctypes.c_uint8 * max_items)()
+        self.values = (ctypes.c_void_p * max_items)()
+        self._key_buffer = key_buffer
+        self.max_items = max_items
+
+
+# Fixed-size C values, each packed into its own 8-byte slot of the encode payload
+_SCALAR_FORMATS = {
+    INTEGER: 'q',
+    BOOLEAN: '?7x',
+    REAL: 'd',
+}
+_SCALAR_PACKERS = {
+    data_type: struct.Struct('=' + fmt).pack for data_type, fmt in _SCALAR_FORMATS.items()
+}
+
+# BINARY values as the C side takes and returns them:
+# struct { const uint8_t* data; size_t len; }
+_BINARY_SLOT = struct.Struct('PN')
+
+
+def marshal_arrays(types, keys, values):
+    """
+    Convert parallel type/key/value sequences into the C arrays taken by
+    dh_encode/dh_encode_batch/eshm_write_data
+
+    All values and keys go into one payload: 8-byte scalar slots first
+    (keeps int64/double aligned), then NUL-terminated keys and strings and
+    the raw BINARY bytes. A BINARY value gets a 16-byte {data, len} slot
+    among the scalars, pointing at its bytes further on. The keys/values
+    arrays point into the payload, so the caller must keep it alive for
+    the duration of the native call.
+
+    Returns:
+        (types, keys, values, payload)
+    """
+    count = len(types)
+    if len(keys) != count or len(values) != count:
+        raise ValueError("types, keys and values must have the same length")
+    c_types = (ctypes.c_uint8 * count)(*types)
+
+    fmt = _SCALAR_FORMATS.get(types[0]) if count else None
+    if fmt is not None and types.count(types[0]) == count:
+        scalars, text, key_offsets = _marshal_scalars(fmt, keys, values)
+        value_offsets = range(0, 8 * count, 8)
+        binaries = ()
+    else:
+        scalars, text, key_offsets, value_offsets, binaries = _marshal_mixed(types, keys, values)
+
+    scalars += text
+    payload = (ctypes.c_char * len(scalars)).from_buffer(scalars)
+    base = ctypes.addressof(payload)
+    text_base = base + len(scalars) - len(text)
+    # BINARY slots can only hold addresses once the payload is in place
+    for slot, offset, length in binaries:
+        _BINARY_SLOT.pack_into(scalars, slot, text_base + offset, length)
+
+    c_keys = (ctypes.c_char_p * count)(*[text_base + offset for offset in key_offsets])
+    c_values = (ctypes.c_void_p * count)(*[
+        base + offset if offset >= 0 else text_base + ~offset
+        for offset in value_offsets
+    ])
+
+    return c_types, c_keys, c_values, payload
+
+
+def _marshal_scalars(fmt, keys, values):
+    """Payload parts for items that all share one fixed-size type"""
+    scalars = bytearray(struct.pack('=' + fmt * len(values), *values))
+    joined = '\0'.join(keys)
+    if joined.isascii():
+        # One encode for all keys; offsets follow from the str lengths
+        text = bytearray(joined.encode('ascii'))
+        text.append(0)
+        key_offsets = [0]
+        key_offsets.extend(accumulate(len(key) + 1 for key in keys))
+        key_offsets.pop()
+    else:
+        text = bytearray()
+        key_offsets = []
+        for key in keys:
+            key_offsets.append(len(text))
+            text += key.encode('utf-8')
+            text.append(0)
+    return scalars, text, key_offsets
+
+
+def _marshal_mixed(types, keys, values):
+    """Payload parts for items of any supported types"""
+    scalars = bytearray()
+    text = bytearray()
+    key_offsets = []
+    value_offsets = []  # >= 0: offset into scalars, < 0: ~offset into text
+    binaries = []  # (slot offset into scalars, offset into text, length)
+
+    for data_type, key, value in zip(types, keys, values):
+        key_offsets.append(len(text))
+        text += key.encode('utf-8')
+        text.append(0)
+
+        pack = _SCALAR_PACKERS.get(data_type)
+        if pack is not None:
+            value_offsets.append(len(scalars))
+            scalars += pack(value)
+        elif data_type == STRING:
+            value_offsets.append(~len(text))
+            text += value.encode('utf-8')
+            text.append(0)
+        elif data_type == BINARY:
+            data = memoryview(value).cast('B')
+            value_offsets.append(len(scalars))
+            binaries.append((len(scalars), len(text), data.nbytes))
+            scalars += bytes(_BINARY_SLOT.size)
+            text += data
+        else:
+            raise ValueError(f"Unsupported data type: {data_type}")
+
+    return scalars, text, key_offsets, value_offsets, binaries
+
+
+def marshal_items(items):
+    """Same as marshal_arrays, for a list of DataItem objects"""
+    return marshal_arrays([item.type for item in items],
+                          [item.key for item in items],
+                          [item.value for item in items])
+
+
+def read_binary(ptr) -> bytes:
+    """Copy out a decoded BINARY value ({data, len} at ptr)"""
+    data, length = _BINARY_SLOT.unpack(ctypes.string_at(ptr, _BINARY_SLOT.size))
+    return ctypes.string_at(data, length) if length else b''
@@ -0,0 +1,367 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# distutils: libraries = eshm
+"""
+Compiled write/read calls for eshm.py
+
+Calls eshm_write/eshm_write_batch/eshm_read/eshm_read_ex/eshm_read_data
+directly instead of going through ctypes, so no libffi marshalling per call;
+write_batch hands the message buffers to C as an iovec array without joining
+them, read_data builds its dict straight from the decoded C values, and
+read_reply runs a whole read/acknowledge loop in C.
+Same class as the ctypes _ChannelIO in eshm.py; built in place by
+build_shared_lib.sh (which links it against build/libeshm.so) when Cython is
+installed, otherwise eshm.py keeps using ctypes.
+"""
+
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE, PyBUF_WRITABLE
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.exc cimport PyErr_CheckSignals
+from libc.stdint cimport int64_t, uint8_t, uint32_t, uintptr_t
+from libc.stdlib cimport malloc, realloc, free
+from libc.string cimport memset, strlen
+
+
+cdef extern from "<sys/uio.h>":
+    struct iovec:
+        void* iov_base
+        size_t iov_len
+
+
+cdef extern from *:
+    """
+    #include <stddef.h>
+    #include <stdint.h>
+    #include <sys/uio.h>
+    int eshm_write(void* handle, const void* data, size_t size);
+    int eshm_write_batch(void* handle, const struct iovec* iov, size_t count);
+    _Bool eshm_batch_next(const void* batch, size_t size, size_t* offset,
+                          const void** message, size_t* message_size);
+    int eshm_read(void* handle, void* buffer, size_t buffer_size);
+    int eshm_read_ex(void* handle, void* buffer, size_t buffer_size,
+                     size_t* bytes_read, uint32_t timeout_ms);
+    int eshm_read_data(void* handle, uint8_t* out_types, char** out_keys,
+                       int max_key_len, void** out_values, int max_items,
+                       int* item_count, uint32_t timeout_ms);
+    void eshm_free_values(void** values, const uint8_t* types, int count);
+    """
+    int eshm_write(void* handle, const void* data, size_t size) nogil
+    int eshm_write_batch(void* handle, const iovec* iov, size_t count) nogil
+    bint eshm_batch_next(const void* batch, size_t size, size_t* offset,
+                         const void** message, size_t* message_size) nogil
+    int eshm_read(void* handle, void* buffer, size_t buffer_size) nogil
+    int eshm_read_ex(void* handle, void* buffer, size_t buffer_size,
+                     size_t* bytes_read, uint32_t timeout_ms) nogil
+    int eshm_read_data(void* handle, uint8_t* out_types, char** out_keys,
+                       int max_key_len, void** out_values, int max_items,
+                       int* item_count, uint32_t timeout_ms) nogil
+    void eshm_free_values(void** values, const uint8_t* types, int count)
+
+
+# Value layout of BINARY items returned by eshm_read_data
+cdef struct BinaryData:
+    uint8_t* data
+    size_t len
+
+
+cdef char _empty = 0
+
+# ESHM_SUCCESS
+cdef enum:
+    SUCCESS = 0
+
+# Key buffer size per item for read_data, same as the ctypes path
+cdef enum:
+    MAX_KEY_LEN = 64
+
+
+# Output arrays for eshm_read_data
+cdef struct ItemArrays:
+    uint8_t* types
+    char* keys
+    char** key_ptrs
+    void** values
+    int max_items
+
+
+cdef void _items_free(ItemArrays* arrays):
+    free(arrays.types)
+    free(arrays.keys)
+    free(arrays.key_ptrs)
+    free(arrays.values)
+    memset(arrays, 0, sizeof(ItemArrays))
+
+
+cdef int _items_reserve(ItemArrays* arrays, int max_items) except -1:
+    cdef int i
+    if max_items <= arrays.max_items:
+        return 0
+    _items_free(arrays)
+    arrays.types = <uint8_t*>malloc(max_items * sizeof(uint8_t))
+    arrays.keys = <char*>malloc(max_items * MAX_KEY_LEN)
+    arrays.key_ptrs = <char**>malloc(max_items * sizeof(char*))
+    arrays.values = <void**>malloc(max_items * sizeof(void*))
+    if (arrays.types == NULL or arrays.keys == NULL or
+            arrays.key_ptrs == NULL or arrays.values == NULL):
+        _items_free(arrays)
+        raise MemoryError()
+    for i in range(max_items):
+        arrays.key_ptrs[i] = arrays.keys + i * MAX_KEY_LEN
+    arrays.max_items = max_items
+    return 0
+
+
+# Decoded read_data keys, same idea as KEY_CACHE in eshm_common.py
+cdef dict _key_cache = {}
+
+cdef enum:
+    KEY_CACHE_SIZE = 1024
+
+
+cdef str _decode_key(bytes raw_key):
+    key = _key_cache.get(raw_key)
+    if key is None:
+        key = raw_key.decode('utf-8')
+        if len(_key_cache) >= KEY_CACHE_SIZE:
+            _key_cache.clear()
+        _key_cache[raw_key] = key
+    return key
+
+
+cdef class ChannelIO:
+    """
+    write/read for one handle, reusing a single read buffer
+
+    The buffer and read_data arrays are marked busy while a call runs
+    without the GIL; a second thread reading the same handle meanwhile
+    gets private ones instead.
+    """
+
+    cdef void* _handle
+    cdef char* _buffer
+    cdef size_t _capacity
+    cdef bint _buffer_busy
+    # read_data output arrays, allocated on first use
+    cdef ItemArrays _items
+    cdef bint _items_busy
+
+    def __cinit__(self, uintptr_t handle, size_t buffer_size=4096):
+        if buffer_size == 0:
+            buffer_size = 1
+        self._handle = <void*>handle
+        self._buffer = <char*>malloc(buffer_size)
+        if self._buffer == NULL:
+            raise MemoryError()
+        self._capacity = buffer_size
+
+    def __dealloc__(self):
+        free(self._buffer)
+        _items_free(&self._items)
+
+    cdef char* _acquire(self, size_t buffer_size, bint* private) except NULL:
+        cdef char* buffer
+        private[0] = self._buffer_busy
+        if private[0]:
+            buffer = <char*>malloc(buffer_size if buffer_size else 1)
+            if buffer == NULL:
+                raise MemoryError()
+            return buffer
+        if buffer_size > self._capacity:
+            buffer = <char*>realloc(self._buffer, buffer_size)
+            if buffer == NULL:
+                raise MemoryError()
+            self._buffer = buffer
+            self._capacity = buffer_size
+        self._buffer_busy = True
+        return self._buffer
+
+    cdef void _release(self, char* buffer, bint private):
+        if private:
+            free(buffer)
+        else:
+            self._buffer_busy = False
+
+    def detach(self):
+        """Forget the handle once it has been destroyed"""
+        self._handle = NULL
+
+    def write(self, data):
+        """Write a bytes-like object, returns the ESHM error code"""
+        cdef Py_buffer view
+        cdef const void* p
+        cdef int ret
+        PyObject_GetBuffer(data, &view, PyBUF_SIMPLE)
+        try:
+            p = view.buf if view.len else &_empty
+            with nogil:
+                ret = eshm_write(self._handle, p, view.len)
+        finally:
+            PyBuffer_Release(&view)
+        return ret
+
+    def write_batch(self, messages):
+        """Write messages as one batch (eshm_write_batch), returns the ESHM error code"""
+        cdef list items = list(messages)
+        cdef Py_ssize_t count = len(items)
+        cdef Py_ssize_t i, acquired = 0
+        cdef Py_buffer* views = <Py_buffer*>malloc((count if count else 1) * sizeof(Py_buffer))
+        cdef iovec* iov = <iovec*>malloc((count if count else 1) * sizeof(iovec))
+        cdef int ret
+        try:
+            if views == NULL or iov == NULL:
+                raise MemoryError()
+            for acquired in range(count):
+                PyObject_GetBuffer(items[acquired], &views[acquired], PyBUF_SIMPLE)
+                iov[acquired].iov_base = views[acquired].buf
+                iov[acquired].iov_len = views[acquired].len
+            acquired = count
+            with nogil:
+                ret = eshm_write_batch(self._handle, iov, count)
+        finally:
+            for i in range(acquired):
+                PyBuffer_Release(&views[i])
+            free(views)
+            free(iov)
+        return ret
+
+    def read(self, size_t buffer_size):
+        """Simple read, returns (bytes read or error code, data or None)"""
+        cdef bint private
+        cdef char* buffer = self._acquire(buffer_size, &private)
+        cdef int ret
+        try:
+            with nogil:
+                ret = eshm_read(self._handle, buffer, buffer_size)
+            if ret < 0:
+                return ret, None
+            return ret, PyBytes_FromStringAndSize(buffer, ret)
+        finally:
+            self._release(buffer, private)
+
+    def read_ex(self, size_t buffer_size, uint32_t timeout_ms):
+        """Extended read, returns (error code, data or None)"""
+        cdef bint private
+        cdef char* buffer = self._acquire(buffer_size, &private)
+        cdef size_t bytes_read = 0
+        cdef int ret
+        try:
+            with nogil:
+                ret = eshm_read_ex(self._handle, buffer, buffer_size, &bytes_read, timeout_ms)
+            if ret != SUCCESS:
+                return ret, None
+            return ret, PyBytes_FromStringAndSize(buffer, bytes_read)
+        finally:
+            self._release(buffer, private)
+
+    def read_into(self, buffer):
+        """Simple read into a writable buffer, returns bytes read or error code"""
+        cdef Py_buffer view
+        cdef int ret
+        PyObject_GetBuffer(buffer, &view, PyBUF_WRITABLE)
+        try:
+            with nogil:
+                ret = eshm_read(self._handle, view.buf, view.len)
+        finally:
+            PyBuffer_Release(&view)
+        return ret
+
+    def read_ex_into(self, buffer, uint32_t timeout_ms):
+        """Extended read into a writable buffer, returns (error code, bytes read)"""
+        cdef Py_buffer view
+        cdef size_t bytes_read = 0
+        cdef int ret
+        PyObject_GetBuffer(buffer, &view, PyBUF_WRITABLE)
+        try:
+            with nogil:
+                ret = eshm_read_ex(self._handle, view.buf, view.len, &bytes_read, timeout_ms)
+        finally:
+            PyBuffer_Release(&view)
+        return ret, bytes_read
+
+    def read_reply(self, buffer, reply, Py_ssize_t max_messages, bint batched,
+                   uint32_t timeout_ms):
+        """Read into buffer and write reply per read until max_messages, returns (error code, messages)"""
+        cdef Py_buffer view, reply_view
+        cdef const void* r
+        cdef const void* message
+        cdef size_t bytes_read = 0, offset, message_size
+        cdef Py_ssize_t count = 0
+        cdef int ret = SUCCESS, read_ret
+        PyObject_GetBuffer(buffer, &view, PyBUF_WRITABLE)
+        try:
+            PyObject_GetBuffer(reply, &reply_view, PyBUF_SIMPLE)
+            try:
+                r = reply_view.buf if reply_view.len else &_empty
+                while count < max_messages:
+                    with nogil:
+                        ret = read_ret = eshm_read_ex(self._handle, view.buf, view.len,
+                                                      &bytes_read, timeout_ms)
+                        if read_ret == SUCCESS:
+                            ret = eshm_write(self._handle, r, reply_view.len)
+                    if read_ret != SUCCESS:
+                        break
+                    if batched:
+                        offset = 0
+                        while eshm_batch_next(view.buf, bytes_read, &offset, &message, &message_size):
+                            count += 1
+                        if offset != bytes_read:
+                            raise ValueError("Truncated batch")
+                    else:
+                        count += 1
+                    if ret != SUCCESS:
+                        break
+                    # Lets Ctrl+C interrupt the loop
+                    PyErr_CheckSignals()
+            finally:
+                PyBuffer_Release(&reply_view)
+        finally:
+            PyBuffer_Release(&view)
+        return ret, count
+
+    def read_data(self, uint32_t timeout_ms, int max_items):
+        """Read and decode in C, returns (error code, dict or None)"""
+        cdef ItemArrays local
+        cdef ItemArrays* arrays = &self._items
+        cdef bint private = self._items_busy
+        cdef int ret, i
+        cdef int count = 0
+        cdef void* value
+        cdef BinaryData* binary
+        cdef uint8_t dtype
+        if private:
+            memset(&local, 0, sizeof(ItemArrays))
+            arrays = &local
+        else:
+            self._items_busy = True
+        try:
+            _items_reserve(arrays, max_items if max_items > 32 else 32)
+            with nogil:
+                ret = eshm_read_data(self._handle, arrays.types, arrays.key_ptrs, MAX_KEY_LEN,
+                                     arrays.values, max_items, &count, timeout_ms)
+            if ret != SUCCESS:
+                return ret, None
+
+            result = {}
+            try:
+                for i in range(count):
+                    key = _decode_key(arrays.key_ptrs[i][:strlen(arrays.key_ptrs[i])])
+                    value = arrays.values[i]
+                    dtype = arrays.types[i]
+                    if dtype == 0:  # INTEGER
+                        result[key] = (<int64_t*>value)[0]
+                    elif dtype == 1:  # BOOLEAN
+                        result[key] = (<uint8_t*>value)[0] != 0
+                    elif dtype == 2:  # REAL
+                        result[key] = (<double*>value)[0]
+                    elif dtype == 3:  # STRING
+                        result[key] = (<char*>value)[:strlen(<char*>value)].decode('utf-8')
+                    elif dtype == 4:  # BINARY
+                        binary = <BinaryData*>value
+                        result[key] = PyBytes_FromStringAndSize(<char*>binary.data, binary.len)
+            finally:
+                eshm_free_values(arrays.values, arrays.types, count)
+            return ret, result
+        finally:
+            if private:
+                _items_free(&local)
+            else:
+                self._items_busy = False
@@ -6,12 +6,14 @@ All encoding/decoding happens in C++, eliminating Python overhead.
 """
 
 import ctypes
-import os
-from typing import List, Dict, Any, Tuple
+import struct
+from typing import List, Dict, Any, Sequence, Tuple
 from enum import IntEnum
 
 # Re-use existing ESHM wrapper
 from eshm import ESHM, ESHMRole, ESHMDisconnectBehavior, ESHMConfig
+from eshm_common import (KEY_CACHE, ReadDataArrays, decode_key, marshal_arrays, marshal_items,
+                         read_binary)
 
 
 class DataType(IntEnum):
@@ -29,31 +31,40 @@ class DataType(IntEnum):
 class DataItem:
     """Data item in the exchange"""
 
+    __slots__ = ('type', 'key', 'value')
+
     def __init__(self, data_type: DataType, key: str, value: Any):
         self.type = data_type
         self.key = key
         self.value = value
 
 
-# Load the library
-_LIB_PATH = os.path.join(os.path.dirname(__file__), '..', 'build', 'libeshm_data_combined.so')
-
-def _load_library():
-    """Load the combined ESHM + DataHandler library"""
-    if not os.path.exists(_LIB_PATH):
-        raise RuntimeError(
-            f"Combined library not found at {_LIB_PATH}\n"
-            "Please build the shared library first:\n"
-            "  cd build\n"
-            "  g++ -shared -fPIC -o libeshm_data_combined.so \\\n"
-            "    ../src/eshm.cpp \\\n"
-            "    ../src/data_handler.cpp \\\n"
-            "    ../src/eshm_data_api.cpp \\\n"
-            "    ../src/asn1_encode.cpp \\\n"
-            "    ../src/asn1_decode.cpp \\\n"
-            "    -I../include -std=c++17 -pthread -lrt"
-        )
-    return ctypes.CDLL(_LIB_PATH)
+# DataType members by value (cheaper than calling DataType() per decoded item)
+_DATA_TYPES = {int(data_type): data_type for data_type in DataType}
+
+# DataType of a Python value for write_dict, looked up by exact type so a
+# bool is not taken for an int
+_TYPES_OF_VALUES = {
+    bool: DataType.BOOLEAN,
+    int: DataType.INTEGER,
+    float: DataType.REAL,
+    str: DataType.STRING,
+    bytes: DataType.BINARY,
+    bytearray: DataType.BINARY,
+}
+
+# Per-type conversion of values returned by eshm_data_read, keyed by plain int
+_VALUE_READERS = {
+    int(DataType.INTEGER): lambda ptr: ctypes.c_int64.from_address(ptr).value,
+    int(DataType.BOOLEAN): lambda ptr: ctypes.c_bool.from_address(ptr).value,
+    int(DataType.REAL): lambda ptr: ctypes.c_double.from_address(ptr).value,
+    int(DataType.STRING): lambda ptr: ctypes.string_at(ptr).decode('utf-8'),
+    int(DataType.BINARY): read_binary,
+}
+
+# Hot-path functions, bound by ESHMData._setup_data_functions (module globals,
+# as in eshm.py)
+_data_write = _data_read = _data_free_values = _data_last_error = None
 
 
 class ESHMData(ESHM):
@@ -80,21 +91,25 @@ class ESHMData(ESHM):
             print(f"{item.key}: {item.value}")
     """
 
-    _data_lib = None
     _data_lib_initialized = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._data_arrays = [ReadDataArrays(100, 256)]
 
         if not ESHMData._data_lib_initialized:
-            ESHMData._data_lib = _load_library()
             ESHMData._setup_data_functions()
             ESHMData._data_lib_initialized = True
 
     @classmethod
     def _setup_data_functions(cls):
-        """Setup data function signatures"""
-        lib = cls._data_lib
+        """Setup data function signatures (the data API lives in libeshm.so)"""
+        lib = ESHM._lib
+        if not hasattr(lib, 'eshm_data_read'):
+            raise RuntimeError(
+                "libeshm.so was built without the data API\n"
+                "Please rebuild it with py/build_shared_lib.sh"
+            )
 
         # eshm_data_get_last_error
         lib.eshm_data_get_last_error.argtypes = []
@@ -110,8 +125,8 @@ class ESHMData(ESHM):
         ]
         lib.eshm_write_data.restype = ctypes.c_int
 
-        # eshm_read_data
-        lib.eshm_read_data.argtypes = [
+        # eshm_data_read
+        lib.eshm_data_read.argtypes = [
             ctypes.c_void_p,                    # eshm handle
             ctypes.POINTER(ctypes.c_uint8),     # out_types
             ctypes.POINTER(ctypes.c_char_p),    # out_keys
@@ -119,12 +134,27 @@ class ESHMData(ESHM):
             ctypes.POINTER(ctypes.c_void_p),    # out_values
             ctypes.c_int                        # max_items
         ]
-        lib.eshm_read_data.restype = ctypes.c_int
+        lib.eshm_data_read.restype = ctypes.c_int
 
         # eshm_data_free_value
         lib.eshm_data_free_value.argtypes = [ctypes.c_uint8, ctypes.c_void_p]
         lib.eshm_data_free_value.restype = None
 
+        # eshm_data_free_values
+        lib.eshm_data_free_values.argtypes = [
+            ctypes.POINTER(ctypes.c_uint8),     # types
+            ctypes.POINTER(ctypes.c_void_p),    # values
+            ctypes.c_int                        # count
+        ]
+        lib.eshm_data_free_values.restype = None
+
+        # Function objects used on the hot paths, looked up once
+        global _data_write, _data_read, _data_free_values, _data_last_error
+        _data_write = lib.eshm_write_data
+        _data_read = lib.eshm_data_read
+        _data_free_values = lib.eshm_data_free_values
+        _data_last_error = lib.eshm_data_get_last_error
+
     def write_data(self, items: List[DataItem]) -> None:
         """
         Write data items to ESHM with encoding done in C++
@@ -138,41 +168,57 @@ class ESHMData(ESHM):
         Raises:
             RuntimeError: If write fails
         """
-        count = len(items)
-
-        # Prepare arrays
-        types = (ctypes.c_uint8 * count)()
-        keys = (ctypes.c_char_p * count)()
-        values = (ctypes.c_void_p * count)()
-
-        # Keep references to prevent garbage collection
-        refs = []
-
-        for i, item in enumerate(items):
-            types[i] = item.type
-            keys[i] = item.key.encode('utf-8')
-
-            if item.type == DataType.INTEGER:
-                val = ctypes.c_int64(item.value)
-                refs.append(val)
-                values[i] = ctypes.addressof(val)
-            elif item.type == DataType.BOOLEAN:
-                val = ctypes.c_bool(item.value)
-                refs.append(val)
-                values[i] = ctypes.addressof(val)
-            elif item.type == DataType.REAL:
-                val = ctypes.c_double(item.value)
-                refs.append(val)
-                values[i] = ctypes.addressof(val)
-            elif item.type == DataType.STRING:
-                val = ctypes.c_char_p(item.value.encode('utf-8'))
-                refs.append(val)
-                values[i] = ctypes.cast(val, ctypes.c_void_p)
-            else:
-                raise ValueError(f"Unsupported data type: {item.type}")
+        # Values and keys packed into one buffer, kept alive by payload
+        self._write_marshalled(len(items), *marshal_items(items))
+
+    def write_arrays(self, types: Sequence[int], keys: Sequence[str],
+                     values: Sequence[Any]) -> None:
+        """
+        Write data items given as parallel sequences
+
+        Item i is (types[i], keys[i], values[i]); the types/keys/values
+        lists of a data_handler.DataBatch can be passed as they are.
+
+        Args:
+            types: DataType of each item
+            keys: Key of each item
+            values: Value of each item
+
+        Raises:
+            ValueError: If the sequences differ in length
+            RuntimeError: If write fails
+        """
+        self._write_marshalled(len(types), *marshal_arrays(types, keys, values))
 
+    def write_dict(self, fields: Dict[str, Any]) -> None:
+        """
+        Write a dictionary of values, the counterpart of read_dict()
+
+        Each value's DataType follows from its Python type (int, bool,
+        float, str, bytes/bytearray); the encoding is done in C++ as in write_data().
+
+        Args:
+            fields: Dictionary mapping keys to values
+
+        Raises:
+            ValueError: If a value's type cannot be encoded, or an int does
+                not fit in 64 bits
+            RuntimeError: If write fails
+        """
+        types_of = _TYPES_OF_VALUES
+        try:
+            types = [types_of[type(value)] for value in fields.values()]
+        except KeyError as e:
+            raise ValueError(f"Unsupported value type: {e.args[0].__name__}") from None
+        try:
+            marshalled = marshal_arrays(types, list(fields), list(fields.values()))
+        except struct.error as e:
+            raise ValueError(f"Value out of range: {e}") from None
+        self._write_marshalled(len(types), *marshalled)
+
+    def _write_marshalled(self, count, types, keys, values, payload):
         # Call combined write (encode + write in C++)
-        result = ESHMData._data_lib.eshm_write_data(
+        result = _data_write(
             self._handle,
             types,
             keys,
@@ -181,7 +227,7 @@ class ESHMData(ESHM):
         )
 
         if result < 0:
-            error = ESHMData._data_lib.eshm_data_get_last_error()
+            error = _data_last_error()
             raise RuntimeError(f"Write data failed: {error.decode('utf-8')}")
 
     def read_data(self, max_items: int = 100) -> List[DataItem]:
@@ -195,73 +241,103 @@ class ESHMData(ESHM):
             max_items: Maximum number of items to read
 
         Returns:
-            List of DataItem objects (can be empty if no data)
+            List of DataItem objects (empty for an empty message)
 
         Raises:
-            RuntimeError: If read fails
+            RuntimeError: If no data arrives within eshm_read's 1 second
+                timeout, or the read/decode fails
         """
-        # Allocate output arrays
-        out_types = (ctypes.c_uint8 * max_items)()
+        return self._read(max_items, False)
 
-        # Allocate key buffers
-        max_key_len = 256
-        key_buffers = [(ctypes.c_char * max_key_len)() for _ in range(max_items)]
-        out_keys = (ctypes.c_char_p * max_items)()
-        for i in range(max_items):
-            out_keys[i] = ctypes.cast(key_buffers[i], ctypes.c_char_p)
+    def read_dict(self, max_items: int = 100) -> Dict[str, Any]:
+        """
+        Read and decode data from ESHM straight into a dictionary
 
-        out_values = (ctypes.c_void_p * max_items)()
+        Same as read_data() followed by extract_values(), without building
+        the intermediate DataItem objects.
+
+        Args:
+            max_items: Maximum number of items to read
+
+        Returns:
+            Dictionary mapping keys to values (empty for an empty message)
+
+        Raises:
+            RuntimeError: If no data arrives within eshm_read's 1 second
+                timeout, or the read/decode fails
+        """
+        return self._read(max_items, True)
+
+    def _read(self, max_items: int, as_dict: bool):
+        # Output arrays are kept on the handle and only grow; a thread that
+        # finds them in use by another read gets its own
+        try:
+            arrays = self._data_arrays.pop()
+        except IndexError:
+            arrays = ReadDataArrays(max_items, 256)
+        try:
+            return self._read_items(arrays, max_items, as_dict)
+        finally:
+            self._data_arrays.append(arrays)
+
+    def _read_items(self, arrays: ReadDataArrays, max_items: int, as_dict: bool):
+        arrays.reserve(max_items)
+        out_types = arrays.types
+        out_keys = arrays.keys
+        out_values = arrays.values
 
         # Call combined read (read + decode in C++)
-        count = ESHMData._data_lib.eshm_read_data(
+        count = _data_read(
             self._handle,
             out_types,
             out_keys,
-            max_key_len,
+            arrays.max_key_len,
             out_values,
             max_items
         )
 
         if count < 0:
-            error = ESHMData._data_lib.eshm_data_get_last_error()
+            error = _data_last_error()
             raise RuntimeError(f"Read data failed: {error.decode('utf-8')}")
 
-        if count == 0:
-            return []  # No data available
-
         # Extract results
-        items = []
-        for i in range(count):
-            dtype = DataType(out_types[i])
-            key = out_keys[i].decode('utf-8')
-
-            if dtype == DataType.INTEGER:
-                value = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_int64)).contents.value
-            elif dtype == DataType.BOOLEAN:
-                value = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_bool)).contents.value
-            elif dtype == DataType.REAL:
-                value = ctypes.cast(out_values[i], ctypes.POINTER(ctypes.c_double)).contents.value
-            elif dtype == DataType.STRING:
-                value = ctypes.cast(out_values[i], ctypes.c_char_p).value.decode('utf-8')
-            else:
-                value = None
-
-            items.append(DataItem(dtype, key, value))
-
-            # Free the allocated value
-            ESHMData._data_lib.eshm_data_free_value(out_types[i], out_values[i])
-
-        return items
+        result = {} if as_dict else []
+        cached_key = KEY_CACHE.get
+        value_reader = _VALUE_READERS.get
+        try:
+            for i in range(count):
+                raw_key = out_keys[i]
+                key = cached_key(raw_key)
+                if key is None:
+                    key = decode_key(raw_key)
+                dtype = out_types[i]
+                read = value_reader(dtype)
+                value = read(out_values[i]) if read is not None else None
+
+                if as_dict:
+                    result[key] = value
+                else:
+                    data_type = _DATA_TYPES.get(dtype)
+                    if data_type is None:
+                        data_type = DataType(dtype)  # raises ValueError
+                    result.append(DataItem(data_type, key, value))
+        finally:
+            # Free all decoded values in one call
+            _data_free_values(out_types, out_values, count)
+
+        return result
 
     def try_read_data(self, max_items: int = 100) -> List[DataItem]:
         """
-        Try to read data without blocking (same as read_data but returns [] on no data)
+        Same as read_data, but returns [] instead of raising on failure
+
+        Still waits up to read_data's 1 second timeout when no data arrives.
 
         Args:
             max_items: Maximum number of items to read
 
         Returns:
-            List of DataItem objects (empty if no data available)
+            List of DataItem objects (empty if no data arrived or the read failed)
         """
         try:
             return self.read_data(max_items)
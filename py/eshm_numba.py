@@ -0,0 +1,64 @@
+"""
+Raw ESHM entry points for JIT-compiled loops
+
+Exposes eshm_write/eshm_read/eshm_read_ex as ctypes function pointers whose
+arguments are all plain integers (handles and buffers passed as addresses),
+which is the form Numba can call from nopython code. This module does not
+import Numba itself; it only needs ctypes and build/libeshm.so.
+
+Example:
+    import numpy as np
+    from numba import njit
+    from eshm import ESHM, ESHMRole
+    from eshm_numba import eshm_write, handle_of
+
+    @njit
+    def producer(handle, buf, count):
+        for i in range(count):
+            buf[0] = i
+            eshm_write(handle, buf.ctypes.data, buf.size)
+
+    master = ESHM("my_shm", role=ESHMRole.MASTER)
+    producer(handle_of(master), np.zeros(64, np.uint8), 1000)
+"""
+
+import ctypes
+
+from eshm import ESHM, _load_library
+
+_lib = _load_library()
+
+# int eshm_write(ESHMHandle* handle, const void* data, size_t size)
+eshm_write = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_size_t
+)(('eshm_write', _lib))
+
+# int eshm_read(ESHMHandle* handle, void* buffer, size_t buffer_size)
+eshm_read = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_size_t
+)(('eshm_read', _lib))
+
+# int eshm_read_ex(ESHMHandle* handle, void* buffer, size_t buffer_size,
+#                  size_t* bytes_read, uint32_t timeout_ms)
+eshm_read_ex = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_size_t,
+    ctypes.c_size_t, ctypes.c_uint32
+)(('eshm_read_ex', _lib))
+
+
+def handle_of(eshm: ESHM) -> int:
+    """
+    Get the native handle of an open ESHM object
+
+    Args:
+        eshm: ESHM instance
+
+    Returns:
+        Handle address to pass to the functions above
+
+    Raises:
+        RuntimeError: If the ESHM object has been closed
+    """
+    if not eshm._handle:
+        raise RuntimeError("ESHM handle is closed")
+    return eshm._handle
@@ -7,19 +7,32 @@ This example demonstrates advanced features:
 - Statistics monitoring
 - Error handling
 - Different read modes (blocking, non-blocking, custom timeout)
+- Fixed-schema binary records (struct) instead of JSON; pass --json to the
+  master to send JSON for comparison
 """
 
 import sys
 import time
 import os
 import json
+import struct
 
 # Add parent directory to path to import eshm module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from eshm import ESHM, ESHMRole
 
-def run_advanced_master():
+# Fixed-schema records: packed IEEE 754 doubles, no text formatting/parsing
+# Sensor record: record type, temperature, humidity, timestamp
+SENSOR_RECORD = struct.Struct('<Bddd')
+# Response record: status (1 = ok), received_at, record type that was received
+RESPONSE_RECORD = struct.Struct('<BdB')
+
+RECORD_TYPES = {1: "sensor_data"}
+TYPE_SENSOR_DATA = 1
+STATUS_OK = 1
+
+def run_advanced_master(use_json=False):
     """Run advanced master example"""
     print("=== Advanced ESHM Master ===")
     print(f"PID: {os.getpid()}\n")
@@ -27,23 +40,37 @@ def run_advanced_master():
     with ESHM("advanced_demo", role=ESHMRole.MASTER) as eshm:
         print(f"Role: {eshm.get_role().name}")
 
-        # Send structured data (JSON)
-        data = {
-            "type": "sensor_data",
-            "temperature": 25.5,
-            "humidity": 60.2,
-            "timestamp": time.time()
-        }
-
-        message = json.dumps(data)
-        eshm.write(message.encode('utf-8'))
-        print(f"Sent JSON data: {message}")
+        temperature, humidity, timestamp = 25.5, 60.2, time.time()
+
+        if use_json:
+            # Send structured data (JSON)
+            data = {
+                "type": "sensor_data",
+                "temperature": temperature,
+                "humidity": humidity,
+                "timestamp": timestamp
+            }
+
+            message = json.dumps(data)
+            eshm.write(message.encode('utf-8'))
+            print(f"Sent JSON data: {message}")
+        else:
+            # Send structured data (binary record)
+            eshm.write(SENSOR_RECORD.pack(TYPE_SENSOR_DATA, temperature, humidity, timestamp))
+            print(f"Sent sensor record: temperature={temperature}, humidity={humidity}, "
+                  f"timestamp={timestamp}")
 
         # Wait for response with custom timeout (500ms)
         print("Waiting for response (500ms timeout)...")
         try:
             response = eshm.read(timeout_ms=500)
-            print(f"Received response: {response.decode('utf-8')}")
+            if len(response) == RESPONSE_RECORD.size:
+                status, received_at, data_type = RESPONSE_RECORD.unpack(response)
+                print(f"Received response: status={'ok' if status == STATUS_OK else status}, "
+                      f"received_at={received_at}, "
+                      f"data_type={RECORD_TYPES.get(data_type, 'unknown')}")
+            else:
+                print(f"Received response: {response.decode('utf-8')}")
         except TimeoutError:
             print("No response received (timeout)")
 
@@ -83,7 +110,20 @@ def run_advanced_slave():
             # Read message with default timeout (1000ms)
             data = eshm.read()
 
-            if data:
+            if len(data) == SENSOR_RECORD.size:
+                # Binary sensor record
+                data_type, temperature, humidity, timestamp = SENSOR_RECORD.unpack(data)
+                print(f"Received sensor record:")
+                print(f"  type: {RECORD_TYPES.get(data_type, 'unknown')}")
+                print(f"  temperature: {temperature}")
+                print(f"  humidity: {humidity}")
+                print(f"  timestamp: {timestamp}")
+
+                # Send binary response
+                eshm.write(RESPONSE_RECORD.pack(STATUS_OK, time.time(), data_type))
+                print(f"\nSent response record")
+
+            elif data:
                 message = data.decode('utf-8')
                 print(f"Received: {message}")
 
@@ -118,16 +158,17 @@ def run_advanced_slave():
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python advanced_example.py <master|slave>")
+        print("Usage: python advanced_example.py <master|slave> [--json]")
         print("\nExamples:")
         print("  Terminal 1: python advanced_example.py master")
         print("  Terminal 2: python advanced_example.py slave")
+        print("\n  --json: master sends JSON instead of a binary record")
         return
 
     mode = sys.argv[1]
 
     if mode == "master":
-        run_advanced_master()
+        run_advanced_master(use_json="--json" in sys.argv[2:])
     elif mode == "slave":
         run_advanced_slave()
     else:
@@ -5,8 +5,11 @@ Benchmark: Native C++ DataHandler vs Pure Python DataHandler
 Compares encoding/decoding performance between:
 1. Pure Python implementation (py/data_handler.py)
 2. Native C++ implementation via ctypes (py/data_handler_native.py)
+
+The garbage collector is disabled while the timed loops run.
 """
 
+import gc
 import sys
 import time
 import os
@@ -15,7 +18,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 # Import both implementations
-from data_handler import DataHandler as PythonDataHandler, DataItem as PyDataItem, DataType as PyDataType
+from data_handler import DataHandler as PythonDataHandler, DataItem as PyDataItem, DataType as PyDataType, DataBatch
 from data_handler_native import NativeDataHandler, DataItem as NativeDataItem, DataType as NativeDataType
 
 def benchmark_python(iterations=10000):
@@ -36,27 +39,43 @@ def benchmark_python(iterations=10000):
         buffer = handler.encode_data_buffer(items)
         decoded = handler.decode_data_buffer(buffer)
 
-    # Benchmark encoding
-    start_time = time.perf_counter()
-    for _ in range(iterations):
-        buffer = handler.encode_data_buffer(items)
-    encode_time = time.perf_counter() - start_time
-
-    # Benchmark decoding
-    start_time = time.perf_counter()
-    for _ in range(iterations):
-        decoded = handler.decode_data_buffer(buffer)
-    decode_time = time.perf_counter() - start_time
-
-    # Benchmark round-trip
-    start_time = time.perf_counter()
-    for _ in range(iterations):
-        buffer = handler.encode_data_buffer(items)
-        decoded = handler.decode_data_buffer(buffer)
-    roundtrip_time = time.perf_counter() - start_time
+    # Keep collector pauses out of the timings
+    gc.collect()
+    gc.disable()
+    try:
+        # Benchmark encoding (into one reused buffer)
+        out = bytearray(256)
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            size = handler.encode_into(items, out)
+        encode_time = time.perf_counter() - start_time
+
+        # Benchmark encoding from parallel arrays (built once, outside the loop)
+        batch = DataBatch([item.type for item in items], [item.key for item in items],
+                          [item.value for item in items])
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            buffer = handler.encode_data_batch(batch)
+        arrays_encode_time = time.perf_counter() - start_time
+
+        # Benchmark decoding
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            decoded = handler.decode_data_buffer(buffer)
+        decode_time = time.perf_counter() - start_time
+
+        # Benchmark round-trip
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            buffer = handler.encode_data_buffer(items)
+            decoded = handler.decode_data_buffer(buffer)
+        roundtrip_time = time.perf_counter() - start_time
+    finally:
+        gc.enable()
 
     return {
         'encode_time': encode_time,
+        'arrays_encode_time': arrays_encode_time,
         'decode_time': decode_time,
         'roundtrip_time': roundtrip_time,
         'buffer_size': len(buffer),
@@ -82,29 +101,46 @@ def benchmark_native(iterations=10000):
         buffer = handler.encode_data_buffer(items)
         decoded = handler.decode_data_buffer(buffer)
 
-    # Benchmark encoding
-    start_time = time.perf_counter()
-    for _ in range(iterations):
-        buffer = handler.encode_data_buffer(items)
-    encode_time = time.perf_counter() - start_time
-
-    # Benchmark decoding
-    start_time = time.perf_counter()
-    for _ in range(iterations):
-        decoded = handler.decode_data_buffer(buffer)
-    decode_time = time.perf_counter() - start_time
-
-    # Benchmark round-trip
-    start_time = time.perf_counter()
-    for _ in range(iterations):
-        buffer = handler.encode_data_buffer(items)
-        decoded = handler.decode_data_buffer(buffer)
-    roundtrip_time = time.perf_counter() - start_time
+    # Keep collector pauses out of the timings
+    gc.collect()
+    gc.disable()
+    try:
+        # Benchmark encoding (into one reused buffer)
+        out = bytearray(256)
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            size = handler.encode_into(items, out)
+        encode_time = time.perf_counter() - start_time
+
+        # Benchmark encoding from parallel arrays (built once, outside the loop)
+        types = [item.type for item in items]
+        keys = [item.key for item in items]
+        values = [item.value for item in items]
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            buffer = handler.encode_arrays(types, keys, values)
+        arrays_encode_time = time.perf_counter() - start_time
+
+        # Benchmark decoding
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            decoded = handler.decode_data_buffer(buffer)
+        decode_time = time.perf_counter() - start_time
+
+        # Benchmark round-trip
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            buffer = handler.encode_data_buffer(items)
+            decoded = handler.decode_data_buffer(buffer)
+        roundtrip_time = time.perf_counter() - start_time
+    finally:
+        gc.enable()
 
     handler.close()
 
     return {
         'encode_time': encode_time,
+        'arrays_encode_time': arrays_encode_time,
         'decode_time': decode_time,
         'roundtrip_time': roundtrip_time,
         'buffer_size': len(buffer),
@@ -135,6 +171,17 @@ def print_results(python_results, native_results):
     print(f"  Speedup: {speedup_encode:.2f}x faster")
     print()
 
+    # Encoding from parallel arrays
+    py_arrays_rate = iterations / python_results['arrays_encode_time']
+    native_arrays_rate = iterations / native_results['arrays_encode_time']
+    speedup_arrays = python_results['arrays_encode_time'] / native_results['arrays_encode_time']
+
+    print("ENCODING (parallel arrays):")
+    print(f"  Python:  {python_results['arrays_encode_time']:.4f}s  ({py_arrays_rate:,.0f} ops/sec)")
+    print(f"  Native:  {native_results['arrays_encode_time']:.4f}s  ({native_arrays_rate:,.0f} ops/sec)")
+    print(f"  Speedup: {speedup_arrays:.2f}x faster")
+    print()
+
     # Decoding
     py_decode_rate = iterations / python_results['decode_time']
     native_decode_rate = iterations / native_results['decode_time']
@@ -2,7 +2,8 @@
 """
 Python Master for Python to C++ interoperability test
 
-Sends data to C++ slave using ESHM and DataHandler
+Sends data to C++ slave using ESHM and DataHandler. The message is encoded
+once and only its changing values are rewritten in place per iteration.
 """
 
 import sys
@@ -10,6 +11,7 @@ import time
 import signal
 import math
 import os
+import struct
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -19,6 +21,68 @@ from data_handler import DataHandler
 
 running = True
 
+# Encoded messages start with an outer SEQUENCE header followed by the type,
+# key and data SEQUENCEs, each header being tag, 0x84 and a 4-byte length
+SEQUENCE_HEADER = struct.Struct('>BBI')
+REAL_VALUE = struct.Struct('>d')
+
+
+def encode_message(handler, counter, temperature, enabled):
+    """Encode one message with DataHandler"""
+    return handler.encode_data_buffer([
+        DataHandler.create_integer("counter", counter),
+        DataHandler.create_real("temperature", temperature),
+        DataHandler.create_boolean("enabled", enabled),
+        DataHandler.create_string("status", "OK"),
+        DataHandler.create_string("source", "Python Master"),
+    ])
+
+
+class MessageTemplate:
+    """
+    Encoded message whose counter, temperature and enabled values are patched in place
+
+    Types, keys, status and source never change, so the message is only
+    re-encoded when a value's encoded size changes: the counter needing
+    another byte, or a temperature of exactly 0.0 (a 2-byte REAL).
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.buffer = bytearray()
+        self.counter_width = 0
+        self.counter_offset = self.temperature_offset = self.enabled_offset = 0
+
+    def _encode(self, counter, temperature, enabled):
+        self.buffer = bytearray(encode_message(self.handler, counter, temperature, enabled))
+
+        # Skip the outer header and the type and key sequences
+        offset = SEQUENCE_HEADER.size
+        for _ in range(2):
+            offset += SEQUENCE_HEADER.size + SEQUENCE_HEADER.unpack_from(self.buffer, offset)[2]
+        offset += SEQUENCE_HEADER.size
+
+        # Data sequence: counter INTEGER, temperature REAL, enabled BOOLEAN, ...
+        # (after a zero temperature, counter_width 0 forces the next re-encode)
+        self.counter_width = self.buffer[offset + 1] if temperature != 0.0 else 0
+        self.counter_offset = offset + 2
+        self.temperature_offset = self.counter_offset + self.counter_width + 3  # tag, length, NR3 marker
+        self.enabled_offset = self.temperature_offset + REAL_VALUE.size + 2     # tag, length
+
+    def update(self, counter, temperature, enabled) -> bytearray:
+        """Set the values and return the encoded message (same bytes as encode_message)"""
+        # Same minimal two's complement width as the DER encoder
+        width = (counter.bit_length() + 8) // 8
+        if width != self.counter_width or temperature == 0.0:
+            self._encode(counter, temperature, enabled)
+            return self.buffer
+
+        buffer = self.buffer
+        buffer[self.counter_offset:self.counter_offset + width] = counter.to_bytes(width, 'big', signed=True)
+        REAL_VALUE.pack_into(buffer, self.temperature_offset, temperature)
+        buffer[self.enabled_offset] = 0xFF if enabled else 0x00
+        return buffer
+
 def signal_handler(sig, frame):
     global running
     running = False
@@ -58,13 +122,17 @@ def main():
         print(f"Failed to create ESHM: {e}")
         return 1
 
-    handler = DataHandler()
+    template = MessageTemplate(DataHandler())
+
+    # Temperature curve, computed once before the send loop
+    temperatures = [25.0 + 10.0 * math.sin(i * 0.1) for i in range(max_count)]
 
     print("Python master ready. Waiting for C++ slave to connect...")
 
-    # Wait for slave
-    while running and not eshm.is_remote_alive():
-        time.sleep(0.1)
+    # Wait for slave (returns as soon as it attaches; the 100ms timeout
+    # only bounds how long Ctrl+C takes to be noticed)
+    while running and not eshm.wait_remote(timeout_ms=100):
+        pass
 
     if not running:
         eshm.close()
@@ -72,24 +140,16 @@ def main():
 
     print("C++ slave connected! Starting data exchange...\n")
 
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     counter = 0
 
     while running and counter < max_count:
         # Generate test data
-        temperature = 25.0 + 10.0 * math.sin(counter * 0.1)
+        temperature = temperatures[counter]
         enabled = (counter % 3 == 0)
 
-        items = [
-            DataHandler.create_integer("counter", counter),
-            DataHandler.create_real("temperature", temperature),
-            DataHandler.create_boolean("enabled", enabled),
-            DataHandler.create_string("status", "OK"),
-            DataHandler.create_string("source", "Python Master"),
-        ]
-
-        # Encode
-        buffer = handler.encode_data_buffer(items)
+        # Encode (only the changing values are rewritten)
+        buffer = template.update(counter, temperature, enabled)
 
         # Send via ESHM
         try:
@@ -106,8 +166,7 @@ def main():
         counter += 1
         time.sleep(0.01)
 
-    end_time = time.time()
-    elapsed = end_time - start_time
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
 
     print()
     print("=" * 40)
@@ -14,7 +14,16 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from eshm import ESHM, ESHMRole, ESHMError
-from data_handler import DataHandler
+from data_handler import DataType, compile_decoder
+
+# Fields sent by interop_cpp_master, in order
+MESSAGE_SCHEMA = [
+    (DataType.INTEGER, "counter"),
+    (DataType.REAL, "temperature"),
+    (DataType.BOOLEAN, "enabled"),
+    (DataType.STRING, "status"),
+    (DataType.STRING, "source"),
+]
 
 running = True
 
@@ -55,25 +64,26 @@ def main():
         print(f"Failed to create ESHM: {e}")
         return 1
 
-    handler = DataHandler()
+    decode_message = compile_decoder(MESSAGE_SCHEMA)
+    # Only the counter is needed for messages that are not printed
+    decode_counter = compile_decoder(MESSAGE_SCHEMA, count=1)
 
     print("Python slave ready. Waiting for C++ master...\n")
 
-    # Wait for first data
+    # Wait for first data (blocking read, returns as soon as data arrives;
+    # the timeout only bounds how long a Ctrl+C takes to be noticed)
     first_data = False
     while running and not first_data:
         try:
-            data = eshm.try_read(buffer_size=4096)
+            data = eshm.read(buffer_size=4096, timeout_ms=100)
             if data:
                 first_data = True
                 print("C++ master detected! Starting to receive data...\n")
                 # Process this first message
-                items = handler.decode_data_buffer(data)
-                values = DataHandler.extract_simple_values(items)
-                counter = values.get("counter", 0)
+                counter, = decode_counter(data)
                 print(f"[Python Slave] #{counter:4d} - First message received")
-            else:
-                time.sleep(0.01)
+        except TimeoutError:
+            continue
         except Exception as e:
             print(f"Error waiting for data: {e}")
             break
@@ -81,41 +91,32 @@ def main():
     # Statistics
     total_received = 1 if first_data else 0
     decode_errors = 0
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     # Receive loop
     while running:
         try:
-            data = eshm.try_read(buffer_size=4096)
-
-            if data is None:
-                time.sleep(0.001)
-                continue
-
-            # Decode
-            items = handler.decode_data_buffer(data)
-            values = DataHandler.extract_simple_values(items)
+            data = eshm.read(buffer_size=4096, timeout_ms=100)
 
-            counter = values.get("counter", -1)
-            temperature = values.get("temperature", 0.0)
-            enabled = values.get("enabled", False)
-            status = values.get("status", "")
-            source = values.get("source", "")
+            # Decode the counter, and the other fields only when printing
+            counter, = decode_counter(data)
 
             total_received += 1
 
             # Print every 10th exchange
             if counter % 10 == 0:
+                counter, temperature, enabled, status, source = decode_message(data)
                 print(f"[Python Slave] #{counter:4d} - temp={temperature:5.2f}, "
                       f"enabled={enabled}, status=\"{status}\", source=\"{source}\"")
 
+        except TimeoutError:
+            continue
         except Exception as e:
             decode_errors += 1
             if decode_errors < 10:
                 print(f"Decode error: {e}")
 
-    end_time = time.time()
-    elapsed = end_time - start_time
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
 
     print()
     print("=" * 40)
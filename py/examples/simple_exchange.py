@@ -11,15 +11,100 @@ import time
 import signal
 import math
 import os
+import ctypes
+import struct
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from eshm import ESHM, ESHMRole, ESHMDisconnectBehavior
-# DataHandler no longer needed - decoding happens in C++ via eshm.read_data()
+# Master encodes with DataHandler, the slave decodes in C++ via eshm.read_data()
+from data_handler import DataHandler
 
 running = True
 
+# Frame period of the master loop: 1ms = 1kHz
+FRAME_NS = 1_000_000
+
+# <time.h>
+TIMER_ABSTIME = 1
+
+# Encoded messages start with an outer SEQUENCE header followed by the type,
+# key and data SEQUENCEs, each header being tag, 0x84 and a 4-byte length
+SEQUENCE_HEADER = struct.Struct('>BBI')
+REAL_VALUE = struct.Struct('>d')
+
+
+class Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.clock_nanosleep.argtypes = [ctypes.c_int, ctypes.c_int,
+                                  ctypes.POINTER(Timespec), ctypes.POINTER(Timespec)]
+_libc.clock_nanosleep.restype = ctypes.c_int
+
+
+def sleep_until(deadline, deadline_ns):
+    """Sleep until deadline_ns on CLOCK_MONOTONIC (same clock as time.monotonic_ns)"""
+    deadline.tv_sec, deadline.tv_nsec = divmod(deadline_ns, 1_000_000_000)
+    # Returns EINTR on a signal, the loop then checks `running`
+    _libc.clock_nanosleep(time.CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(deadline), None)
+
+
+def encode_message(handler, counter, temperature):
+    """Encode one message with DataHandler"""
+    return handler.encode_data_buffer([
+        DataHandler.create_integer("counter", counter),
+        DataHandler.create_real("temperature", temperature),
+        DataHandler.create_string("status", "OK"),
+    ])
+
+
+class MessageTemplate:
+    """
+    Encoded message whose counter and temperature are patched in place
+
+    Types, keys and status never change, so the message is only re-encoded
+    when a value's encoded size changes: the counter needing another byte,
+    or a temperature of exactly 0.0 (a 2-byte REAL).
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.buffer = bytearray()
+        self.counter_width = 0
+        self.counter_offset = self.temperature_offset = 0
+
+    def _encode(self, counter, temperature):
+        self.buffer = bytearray(encode_message(self.handler, counter, temperature))
+
+        # Skip the outer header and the type and key sequences
+        offset = SEQUENCE_HEADER.size
+        for _ in range(2):
+            offset += SEQUENCE_HEADER.size + SEQUENCE_HEADER.unpack_from(self.buffer, offset)[2]
+        offset += SEQUENCE_HEADER.size
+
+        # Data sequence: counter INTEGER, temperature REAL, status
+        # (after a zero temperature, counter_width 0 forces the next re-encode)
+        self.counter_width = self.buffer[offset + 1] if temperature != 0.0 else 0
+        self.counter_offset = offset + 2
+        self.temperature_offset = self.counter_offset + self.counter_width + 3  # tag, length, NR3 marker
+
+    def update(self, counter, temperature) -> bytearray:
+        """Set the values and return the encoded message (same bytes as encode_message)"""
+        # Same minimal two's complement width as the DER encoder
+        width = (counter.bit_length() + 8) // 8
+        if width != self.counter_width or temperature == 0.0:
+            self._encode(counter, temperature)
+            return self.buffer
+
+        buffer = self.buffer
+        buffer[self.counter_offset:self.counter_offset + width] = counter.to_bytes(width, 'big', signed=True)
+        REAL_VALUE.pack_into(buffer, self.temperature_offset, temperature)
+        return buffer
+
+
 def signal_handler(sig, frame):
     global running
     running = False
@@ -27,34 +112,55 @@ def signal_handler(sig, frame):
 class Statistics:
     def __init__(self):
         self.exchanges = 0
+        self.interval_exchanges = 0
         self.decode_errors = 0
         self.min_temp = float('inf')
         self.max_temp = float('-inf')
         self.sum_temp = 0.0
         self.min_counter = float('inf')
         self.max_counter = float('-inf')
+        self.last_counter = None
+        self.missed = 0
+        self.gaps = 0
         self.start_time = None
 
     def update(self, temp, counter):
+        # Plain comparisons: called once per exchange, and min()/max() calls
+        # cost more than the comparison itself
         self.exchanges += 1
-        self.min_temp = min(self.min_temp, temp)
-        self.max_temp = max(self.max_temp, temp)
+        self.interval_exchanges += 1
+        if temp < self.min_temp:
+            self.min_temp = temp
+        if temp > self.max_temp:
+            self.max_temp = temp
         self.sum_temp += temp
-        self.min_counter = min(self.min_counter, counter)
-        self.max_counter = max(self.max_counter, counter)
+        if counter < self.min_counter:
+            self.min_counter = counter
+        if counter > self.max_counter:
+            self.max_counter = counter
+
+        # Count messages missed between consecutive reads (reported by print_stats)
+        last = self.last_counter
+        if last is not None and counter - last > 1:
+            self.missed += counter - last - 1
+            self.gaps += 1
+        self.last_counter = counter
 
     def print_stats(self):
         elapsed = time.time() - self.start_time
-        avg_temp = self.sum_temp / self.exchanges if self.exchanges > 0 else 0
+        # sum_temp covers the current interval only
+        avg_temp = self.sum_temp / self.interval_exchanges if self.interval_exchanges > 0 else 0
 
         print(f"\n=== Statistics (after {self.exchanges} exchanges) ===")
         print(f"  Elapsed time: {elapsed:.3f} s")
         print(f"  Exchange rate: {self.exchanges / elapsed:.1f} Hz")
         print(f"  Temperature: min={self.min_temp:.2f}, max={self.max_temp:.2f}, avg={avg_temp:.2f}")
         print(f"  Counter: min={int(self.min_counter)}, max={int(self.max_counter)}")
+        print(f"  Missed messages: {self.missed} (in {self.gaps} gaps)")
         print(f"  Decode errors: {self.decode_errors}")
 
     def reset_interval(self):
+        self.interval_exchanges = 0
         self.min_temp = float('inf')
         self.max_temp = float('-inf')
         self.sum_temp = 0.0
@@ -76,7 +182,7 @@ def run_master(shm_name):
         print(f"Failed to create ESHM: {e}")
         return
 
-    handler = DataHandler()
+    template = MessageTemplate(DataHandler())
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
@@ -84,9 +190,10 @@ def run_master(shm_name):
 
     print("Master ready. Waiting for slave to connect...")
 
-    # Wait for slave
-    while running and not eshm.is_remote_alive():
-        time.sleep(0.1)
+    # Wait for slave (returns as soon as it attaches; the 100ms timeout
+    # only bounds how long Ctrl+C takes to be noticed)
+    while running and not eshm.wait_remote(timeout_ms=100):
+        pass
 
     if not running:
         eshm.close()
@@ -94,24 +201,25 @@ def run_master(shm_name):
 
     print("Slave connected! Starting data exchange at 1kHz...\n")
 
-    while running:
-        frame_start = time.perf_counter()
+    # Absolute deadlines, so sleep overshoot does not add up into drift
+    deadline = Timespec()
+    deadline_ns = time.monotonic_ns()
+
+    # Looked up once instead of every frame
+    update = template.update
+    write = eshm.write
+    monotonic_ns = time.monotonic_ns
 
+    while running:
         # Generate data: counter, temperature, status message
         temperature = 20.0 + 5.0 * math.sin(counter * 0.01)
 
-        items = [
-            DataHandler.create_integer("counter", counter),
-            DataHandler.create_real("temperature", temperature),
-            DataHandler.create_string("status", "OK"),
-        ]
-
-        # Encode
-        buffer = handler.encode_data_buffer(items)
+        # Encode (patches the previous frame's message in place)
+        buffer = update(counter, temperature)
 
         # Send via ESHM
         try:
-            eshm.write(buffer)
+            write(buffer)
         except Exception as e:
             print(f"Write error: {e}")
             break
@@ -122,13 +230,14 @@ def run_master(shm_name):
 
         counter += 1
 
-        # Sleep to maintain 1kHz
-        frame_end = time.perf_counter()
-        elapsed = frame_end - frame_start
-        sleep_time = 0.001 - elapsed  # 1ms = 1kHz
-
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        # Sleep until the next frame to maintain 1kHz
+        deadline_ns += FRAME_NS
+        now_ns = monotonic_ns()
+        if now_ns - deadline_ns > FRAME_NS:
+            # More than a frame behind (e.g. the process was stopped), resync
+            # instead of writing a burst of frames to catch up
+            deadline_ns = now_ns
+        sleep_until(deadline, deadline_ns)
 
     print(f"\nMaster shutting down after {counter} exchanges")
     eshm.close()
@@ -160,10 +269,13 @@ def run_slave(shm_name):
     first_data_received = False
     successful_reads = 0
     timeout_count = 0
+    # Looked up once instead of every message
+    read_data = eshm.read_data
+    update = stats.update
     while running:
         # Use optimized read_data() that decodes in C++ before returning to Python
         try:
-            values = eshm.read_data(timeout_ms=10, max_items=10)
+            values = read_data(timeout_ms=10, max_items=10)
         except TimeoutError:
             timeout_count += 1
             if timeout_count % 1000 == 0:
@@ -187,14 +299,8 @@ def run_slave(shm_name):
             temperature = values.get("temperature", 0.0)
             status = values.get("status", "")
 
-            stats.update(temperature, counter)
-
-            # Track message gaps to detect missed messages
-            if hasattr(stats, 'last_counter'):
-                gap = counter - stats.last_counter
-                if gap > 1:
-                    print(f"[WARNING] Missed {gap-1} messages! (last={stats.last_counter}, current={counter})")
-            stats.last_counter = counter
+            # Also tracks message gaps to count missed messages
+            update(temperature, counter)
 
             # Print every 1000th exchange
             if counter % 1000 == 0 and counter > 0:
@@ -217,18 +323,24 @@ def run_slave(shm_name):
 
 def main():
     if len(sys.argv) < 3:
-        print(f"Usage: {sys.argv[0]} <master|slave> <shm_name>")
+        print(f"Usage: {sys.argv[0]} <master|slave> <shm_name> [cpu]")
         print("\nExample:")
         print(f"  Terminal 1 (Master): {sys.argv[0]} master test_exchange")
         print(f"  Terminal 2 (Slave):  {sys.argv[0]} slave test_exchange")
         print("\nCompatible with C++ simple_exchange:")
         print(f"  Terminal 1 (Python):  {sys.argv[0]} master test_exchange")
         print(f"  Terminal 2 (C++):     ./build/examples/simple_exchange slave test_exchange")
+        print("\n  cpu: pin the process to this CPU (e.g. master and slave on sibling cores)")
         return 1
 
     mode = sys.argv[1]
     shm_name = sys.argv[2]
 
+    if len(sys.argv) > 3:
+        # Pin before the shared memory is created/attached, so its pages are
+        # also first touched from this core's NUMA node
+        os.sched_setaffinity(0, {int(sys.argv[3])})
+
     if mode == "master":
         run_master(shm_name)
     elif mode == "slave":
@@ -14,6 +14,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from eshm import ESHM, ESHMRole, ESHMError
 
+# Seconds between is_remote_alive() checks (a library call, kept off every iteration)
+ALIVE_CHECK_INTERVAL = 1.0
+
 def main():
     # Get SHM name from command line or use default
     shm_name = sys.argv[1] if len(sys.argv) > 1 else "eshm1"
@@ -28,6 +31,8 @@ def main():
         print("Press Ctrl+C to stop\n")
 
         message_count = 0
+        last_alive_check = time.monotonic()
+        response = bytearray(4096)
 
         try:
             while True:
@@ -37,14 +42,17 @@ def main():
                 print(f"[MASTER] Sent: {message}")
 
                 # Try to read response from slave (non-blocking)
-                response = eshm.try_read()
-                if response:
+                size = eshm.try_read_into(response)
+                if size:
                     # Decode and strip any null terminators or garbage
-                    print(f"[MASTER] Received: {response.decode('utf-8').rstrip(chr(0))}")
+                    print(f"[MASTER] Received: {response[:size].decode('utf-8').rstrip(chr(0))}")
 
-                # Check if slave is alive
-                if not eshm.is_remote_alive():
-                    print("[MASTER] WARNING: Slave is not alive/connected")
+                # Check if slave is alive (at most every ALIVE_CHECK_INTERVAL)
+                now = time.monotonic()
+                if now - last_alive_check >= ALIVE_CHECK_INTERVAL:
+                    last_alive_check = now
+                    if not eshm.is_remote_alive():
+                        print("[MASTER] WARNING: Slave is not alive/connected")
 
                 message_count += 1
                 time.sleep(0.5)
@@ -15,6 +15,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from eshm import ESHM, ESHMRole, ESHMError
 
+# Seconds between is_remote_alive() checks (a library call, kept off every iteration)
+ALIVE_CHECK_INTERVAL = 1.0
+
 def main():
     # Get SHM name from command line or use default
     shm_name = sys.argv[1] if len(sys.argv) > 1 else "eshm1"
@@ -34,6 +37,7 @@ def main():
         print("Press Ctrl+C to stop\n")
 
         message_count = 0
+        last_alive_check = time.monotonic()
 
         try:
             while True:
@@ -58,9 +62,12 @@ def main():
                     # (Could be waiting for data or reconnecting to master)
                     pass
 
-                # Check if master is alive
-                if not eshm.is_remote_alive():
-                    print("[SLAVE] WARNING: Master is not alive - waiting for reconnection...")
+                # Check if master is alive (at most every ALIVE_CHECK_INTERVAL)
+                now = time.monotonic()
+                if now - last_alive_check >= ALIVE_CHECK_INTERVAL:
+                    last_alive_check = now
+                    if not eshm.is_remote_alive():
+                        print("[SLAVE] WARNING: Master is not alive - waiting for reconnection...")
 
         except KeyboardInterrupt:
             print("\n[SLAVE] Shutting down...")
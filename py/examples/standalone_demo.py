@@ -3,7 +3,8 @@
 Standalone ESHM Demo
 
 This is a complete, self-contained example showing both master and slave
-in a single file. Demonstrates fork() for multi-process communication.
+in a single file. Demonstrates fork() for multi-process communication,
+with a pipe and wait_remote() as a startup handshake instead of fixed sleeps.
 """
 
 import sys
@@ -17,13 +18,26 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from eshm import ESHM, ESHMRole
 
 
-def master_process(shm_name):
-    """Master process"""
+def master_process(shm_name, ready_fd=None):
+    """
+    Master process
+
+    Args:
+        shm_name: Shared memory name
+        ready_fd: Pipe to write a byte to once initialized (closed by the caller)
+    """
     print(f"[MASTER PID {os.getpid()}] Starting...")
 
     with ESHM(shm_name, role=ESHMRole.MASTER) as eshm:
         print(f"[MASTER] Initialized as {eshm.get_role().name}")
 
+        if ready_fd is not None:
+            # Shared memory exists now, let the slave attach
+            os.write(ready_fd, b'\0')
+            # Don't send before the slave is attached, it would miss the message
+            if not eshm.wait_remote(timeout_ms=5000):
+                print("[MASTER] Slave did not attach, sending anyway")
+
         for i in range(5):
             # Send message
             message = f"Message #{i}"
@@ -85,22 +99,33 @@ def run_demo():
 
     shm_name = "standalone_demo"
 
+    # Startup handshake: the slave waits on this pipe for the master to
+    # initialize, the master then waits for the slave with wait_remote()
+    ready_r, ready_w = os.pipe()
+
     # Fork to create slave process
     pid = os.fork()
 
     if pid == 0:
         # Child process (slave)
-        time.sleep(0.5)  # Give master time to initialize
+        os.close(ready_w)
         try:
-            slave_process(shm_name)
+            # Wait for the master to initialize (EOF: it failed, so give up)
+            if os.read(ready_r, 1):
+                slave_process(shm_name)
         except Exception as e:
             print(f"[SLAVE ERROR] {e}")
         finally:
             os._exit(0)
     else:
         # Parent process (master)
+        os.close(ready_r)
         try:
-            master_process(shm_name)
+            try:
+                master_process(shm_name, ready_w)
+            finally:
+                # If the master failed before signalling, the slave sees EOF and exits
+                os.close(ready_w)
 
             # Wait for slave to finish
             os.waitpid(pid, 0)
@@ -5,27 +5,54 @@ ESHM Benchmark Slave - Performance Testing
 Based on simple_slave.py but optimized for benchmarking:
 - Prints stats only every N messages (default: 1000)
 - Measures actual message reception rate
+- Receives and acknowledges in one read_reply call per stats interval
+- Optionally counts the messages of batches sent with write_batch (batch size > 1)
+- Optionally pins itself to one CPU (put master and slave on sibling cores)
 - No verbose per-message output
 """
 
+import gc
 import sys
 import time
 import os
+import signal
 
 # Add parent directory to path to import eshm module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from eshm import ESHM, ESHMRole, ESHMError
 
+# Acknowledgment sent for every message (masters just count responses;
+# null terminator kept for C++ compatibility)
+ACK = b"ACK from Python slave\0"
+
+running = True
+
+def signal_handler(sig, frame):
+    # Stop after the current read_reply call instead of raising
+    # KeyboardInterrupt inside it, so its messages are still counted
+    global running
+    running = False
+
 def main():
     # Get parameters from command line
     shm_name = sys.argv[1] if len(sys.argv) > 1 else "eshm1"
     stats_interval = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    cpu = int(sys.argv[4]) if len(sys.argv) > 4 else None
 
     print("=== ESHM Benchmark Slave ===")
     print(f"PID: {os.getpid()}")
     print(f"SHM Name: {shm_name}")
-    print(f"Stats interval: every {stats_interval} messages\n")
+    print(f"Stats interval: every {stats_interval} messages")
+    print(f"Batch size: {batch_size} messages per write")
+    print(f"CPU: {cpu if cpu is not None else 'any'}\n")
+
+    if cpu is not None:
+        # Stay on one core so the channel's cache lines don't move with us
+        # (pinned before opening the channel, so a newly created segment is
+        # also first touched from this core's NUMA node)
+        os.sched_setaffinity(0, {cpu})
 
     # Initialize ESHM as slave with reconnection support
     with ESHM(shm_name,
@@ -38,48 +65,53 @@ def main():
         print("Press Ctrl+C to stop\n")
         sys.stdout.flush()
 
-        message_count = 0
-        start_time = time.time()
-        last_print_time = start_time
+        # Keep collector pauses out of the measurement
+        gc.collect()
+        gc.disable()
 
-        try:
-            while True:
-                try:
-                    # Read message from master (1000ms timeout)
-                    data = eshm.read()
-
-                    if data:
-                        # Decode and strip any null terminators
-                        message = data.decode('utf-8').rstrip('\0')
-
-                        # Send acknowledgment with null terminator for C++ compatibility
-                        response = f"ACK from Python slave #{message_count}"
-                        eshm.write((response + '\0').encode('utf-8'))
-
-                        message_count += 1
+        message_count = 0
+        start_ns = time.perf_counter_ns()
+        last_print_ns = start_ns
+        # Message count of the next stats line
+        next_report = stats_interval
 
-                        # Print stats at intervals
-                        if message_count % stats_interval == 0:
-                            now = time.time()
-                            elapsed = now - start_time
-                            interval_elapsed = now - last_print_time
-                            rate = message_count / elapsed if elapsed > 0 else 0
-                            interval_rate = stats_interval / interval_elapsed if interval_elapsed > 0 else 0
+        # Messages are read into this one buffer instead of a new bytes each time
+        buffer = bytearray(4096)
+        batched = batch_size > 1
 
-                            print(f"[{message_count:6d}] Total: {elapsed:6.1f}s, {rate:6.1f} msg/s | "
-                                  f"Interval: {interval_rate:6.1f} msg/s")
-                            sys.stdout.flush()
-                            last_print_time = now
+        # Bound method looked up once instead of on every call
+        read_reply = eshm.read_reply
 
-                except TimeoutError:
-                    # Timeout is normal - just continue
-                    pass
+        signal.signal(signal.SIGINT, signal_handler)
 
-        except KeyboardInterrupt:
-            print("\n[SLAVE] Shutting down...")
+        try:
+            while running:
+                # Receive and acknowledge every message up to the next stats
+                # line in one call (the loop runs in C with eshm_cy); returns
+                # early when nothing arrives for 1000ms, which is normal
+                message_count += read_reply(buffer, ACK, next_report - message_count,
+                                            batched, timeout_ms=1000)
+
+                # Print stats at intervals
+                if message_count >= next_report:
+                    now_ns = time.perf_counter_ns()
+                    elapsed = (now_ns - start_ns) / 1e9
+                    interval_elapsed = (now_ns - last_print_ns) / 1e9
+                    rate = message_count / elapsed if elapsed > 0 else 0
+                    interval_rate = stats_interval / interval_elapsed if interval_elapsed > 0 else 0
+
+                    # No explicit flush on the receive path (a terminal is line-buffered anyway)
+                    sys.stdout.write(f"[{message_count:6d}] Total: {elapsed:6.1f}s, {rate:6.1f} msg/s | "
+                                     f"Interval: {interval_rate:6.1f} msg/s\n")
+                    last_print_ns = now_ns
+                    next_report = (message_count // stats_interval + 1) * stats_interval
+        finally:
+            gc.enable()
+
+        print("\n[SLAVE] Shutting down...")
 
         # Print final stats
-        elapsed = time.time() - start_time
+        elapsed = (time.perf_counter_ns() - start_ns) / 1e9
         rate = message_count / elapsed if elapsed > 0 else 0
 
         print("\n=== Final Benchmark Results ===")
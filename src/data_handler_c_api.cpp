@@ -33,8 +33,61 @@ void dh_destroy(DataHandlerHandle handle) {
     }
 }
 
+// Convert C arrays of types/keys/values into DataItems
+// Returns false (with last_error set) on an unsupported type
+static bool build_items(const uint8_t* types,
+                        const char** keys,
+                        const void** values,
+                        int count,
+                        std::vector<DataItem>& items)
+{
+    items.reserve(items.size() + count);
+
+    for (int i = 0; i < count; i++) {
+        DataType type = static_cast<DataType>(types[i]);
+        std::string key = keys[i];
+
+        switch (type) {
+            case DataType::INTEGER: {
+                int64_t val = *static_cast<const int64_t*>(values[i]);
+                items.push_back(DataHandler::createInteger(key, val));
+                break;
+            }
+            case DataType::BOOLEAN: {
+                bool val = *static_cast<const bool*>(values[i]);
+                items.push_back(DataHandler::createBoolean(key, val));
+                break;
+            }
+            case DataType::REAL: {
+                double val = *static_cast<const double*>(values[i]);
+                items.push_back(DataHandler::createReal(key, val));
+                break;
+            }
+            case DataType::STRING: {
+                const char* val = static_cast<const char*>(values[i]);
+                items.push_back(DataHandler::createString(key, std::string(val)));
+                break;
+            }
+            case DataType::BINARY: {
+                // For binary: values[i] points to a struct { uint8_t* data; size_t len; }
+                struct BinaryData { const uint8_t* data; size_t len; };
+                auto* bin = static_cast<const BinaryData*>(values[i]);
+                std::vector<uint8_t> vec(bin->data, bin->data + bin->len);
+                items.push_back(DataHandler::createBinary(key, vec));
+                break;
+            }
+            default:
+                snprintf(last_error, sizeof(last_error), "Unsupported type: %d", (int)type);
+                return false;
+        }
+    }
+
+    return true;
+}
+
 // Encode data items into buffer
-// Returns size of encoded data, or negative on error
+// Returns size of encoded data, or negative on error.
+// If out_buffer is too small, returns -(required size) so the caller can retry.
 int dh_encode(DataHandlerHandle handle,
               const uint8_t* types,    // DataType values
               const char** keys,       // String keys (null-terminated)
@@ -51,45 +104,8 @@ int dh_encode(DataHandlerHandle handle,
     try {
         auto* dh = static_cast<DataHandler*>(handle);
         std::vector<DataItem> items;
-        items.reserve(count);
-
-        for (int i = 0; i < count; i++) {
-            DataType type = static_cast<DataType>(types[i]);
-            std::string key = keys[i];
-
-            switch (type) {
-                case DataType::INTEGER: {
-                    int64_t val = *static_cast<const int64_t*>(values[i]);
-                    items.push_back(DataHandler::createInteger(key, val));
-                    break;
-                }
-                case DataType::BOOLEAN: {
-                    bool val = *static_cast<const bool*>(values[i]);
-                    items.push_back(DataHandler::createBoolean(key, val));
-                    break;
-                }
-                case DataType::REAL: {
-                    double val = *static_cast<const double*>(values[i]);
-                    items.push_back(DataHandler::createReal(key, val));
-                    break;
-                }
-                case DataType::STRING: {
-                    const char* val = static_cast<const char*>(values[i]);
-                    items.push_back(DataHandler::createString(key, std::string(val)));
-                    break;
-                }
-                case DataType::BINARY: {
-                    // For binary: values[i] points to a struct { uint8_t* data; size_t len; }
-                    struct BinaryData { const uint8_t* data; size_t len; };
-                    auto* bin = static_cast<const BinaryData*>(values[i]);
-                    std::vector<uint8_t> vec(bin->data, bin->data + bin->len);
-                    items.push_back(DataHandler::createBinary(key, vec));
-                    break;
-                }
-                default:
-                    snprintf(last_error, sizeof(last_error), "Unsupported type: %d", (int)type);
-                    return -1;
-            }
+        if (!build_items(types, keys, values, count, items)) {
+            return -1;
         }
 
         auto buffer = dh->encodeDataBuffer(items);
@@ -97,7 +113,7 @@ int dh_encode(DataHandlerHandle handle,
         if ((int)buffer.size() > out_buffer_size) {
             snprintf(last_error, sizeof(last_error),
                     "Buffer too small: need %zu, have %d", buffer.size(), out_buffer_size);
-            return -1;
+            return -static_cast<int>(buffer.size());
         }
 
         memcpy(out_buffer, buffer.data(), buffer.size());
@@ -109,6 +125,67 @@ int dh_encode(DataHandlerHandle handle,
     }
 }
 
+// Encode several messages in one call
+// types/keys/values hold the items of all messages back to back, item_counts[i]
+// is the number of items in message i. Message i is written to
+// out_buffer[out_offsets[i] .. out_offsets[i + 1]) (out_offsets has batch_count + 1 entries).
+// Returns total size of encoded data, or negative on error.
+// If out_buffer is too small, returns -(required size) so the caller can retry.
+int dh_encode_batch(DataHandlerHandle handle,
+                    const uint8_t* types,
+                    const char** keys,
+                    const void** values,
+                    const int* item_counts,
+                    int batch_count,
+                    int* out_offsets,
+                    uint8_t* out_buffer,
+                    int out_buffer_size)
+{
+    if (!handle || !types || !keys || !values || !item_counts || !out_offsets || !out_buffer) {
+        snprintf(last_error, sizeof(last_error), "Invalid parameters");
+        return -1;
+    }
+
+    try {
+        auto* dh = static_cast<DataHandler*>(handle);
+        std::vector<std::vector<uint8_t>> buffers;
+        buffers.reserve(batch_count);
+        size_t total = 0;
+        int first = 0;
+
+        for (int b = 0; b < batch_count; b++) {
+            std::vector<DataItem> items;
+            if (!build_items(types + first, keys + first, values + first, item_counts[b], items)) {
+                return -1;
+            }
+            first += item_counts[b];
+
+            buffers.push_back(dh->encodeDataBuffer(items));
+            total += buffers.back().size();
+        }
+
+        if ((int)total > out_buffer_size) {
+            snprintf(last_error, sizeof(last_error),
+                    "Buffer too small: need %zu, have %d", total, out_buffer_size);
+            return -static_cast<int>(total);
+        }
+
+        int offset = 0;
+        for (int b = 0; b < batch_count; b++) {
+            out_offsets[b] = offset;
+            memcpy(out_buffer + offset, buffers[b].data(), buffers[b].size());
+            offset += buffers[b].size();
+        }
+        out_offsets[batch_count] = offset;
+
+        return offset;
+
+    } catch (const std::exception& e) {
+        snprintf(last_error, sizeof(last_error), "Encode failed: %s", e.what());
+        return -1;
+    }
+}
+
 // Decode buffer into data items
 // Returns number of items decoded, or negative on error
 int dh_decode(DataHandlerHandle handle,
@@ -214,4 +291,14 @@ void dh_free_value(uint8_t type, void* value) {
     }
 }
 
+// Free all values returned by one dh_decode call
+void dh_free_values(const uint8_t* types, void** values, int count) {
+    if (!types || !values) return;
+
+    for (int i = 0; i < count; i++) {
+        dh_free_value(types[i], values[i]);
+        values[i] = nullptr;
+    }
+}
+
 } // extern "C"
@@ -10,6 +10,9 @@
 #include <time.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <limits.h>
+#include <linux/futex.h>
+#include <sys/syscall.h>
 
 // Compiler memory barriers
 #define smp_mb() __sync_synchronize()
@@ -69,6 +72,42 @@ static inline bool seqlock_read_retry(const struct ESHMSeqLock* lock, uint32_t s
     return lock->sequence != seq;
 }
 
+// Longest single futex wait in a blocking read; the read loop re-checks the
+// attach/stale state between waits
+static const uint32_t READ_WAIT_SLICE_MS = 10;
+
+// Wake readers blocked in channel_wait (called after each write)
+static inline void channel_notify(ESHMChannel* channel) {
+    __sync_fetch_and_add(&channel->wake_seq, 1);
+    // Skip the syscall when nobody waits; a reader registering concurrently
+    // sees the new wake_seq and does not block
+    if (channel->waiters) {
+        syscall(SYS_futex, &channel->wake_seq, FUTEX_WAKE, INT_MAX, NULL, NULL, 0);
+    }
+}
+
+// Block until the channel is written after wake_seq was read as seq, or timeout
+static void channel_wait(ESHMChannel* channel, uint32_t seq, uint32_t timeout_ms) {
+    struct timespec ts;
+    ts.tv_sec = timeout_ms / 1000;
+    ts.tv_nsec = (long)(timeout_ms % 1000) * 1000000L;
+
+    // Shared (not FUTEX_PRIVATE) futex: the writer is another process
+    __sync_fetch_and_add(&channel->waiters, 1);
+    syscall(SYS_futex, &channel->wake_seq, FUTEX_WAIT, seq, &ts, NULL, 0);
+    __sync_fetch_and_sub(&channel->waiters, 1);
+}
+
+// Longest single futex wait in eshm_wait_remote, so a peer that sets its
+// alive flag without a wake (or a kernel without futexes) is still noticed
+static const uint32_t ATTACH_WAIT_SLICE_MS = 100;
+
+// Set an alive flag in the header and wake eshm_wait_remote callers
+static inline void set_alive(volatile uint32_t* flag) {
+    *flag = 1;
+    syscall(SYS_futex, flag, FUTEX_WAKE, INT_MAX, NULL, NULL, 0);
+}
+
 // Helper function to get current time in milliseconds
 static uint64_t get_time_ms() {
     struct timespec ts;
@@ -251,7 +290,9 @@ static void* monitor_thread_func(void* arg) {
 
                             // Reset slave info
                             handle->shm_data->header.slave_pid = getpid();
-                            handle->shm_data->header.slave_alive = 1;
+                            // Count reads from the new master's channel
+                            handle->last_read_write_count = new_shm_data->master_to_slave.write_count;
+                            set_alive(&handle->shm_data->header.slave_alive);
 
                             fprintf(stderr, "[ESHM] Slave RECONNECTED to master (after %lu ms)!\n",
                                     reconnect_wait_counter);
@@ -387,7 +428,7 @@ ESHMHandle* eshm_init(const ESHMConfig* config) {
     handle->shm_fd = -1;
     handle->shm_data = NULL;
     handle->threads_running = false;
-    handle->last_read_write_count = 0;  // Initialize read tracking
+    handle->last_read_write_count = 0;  // Set once attached, below
 
     // Generate POSIX SHM name (e.g., "/eshm_demo")
     generate_shm_name(handle->shm_name, sizeof(handle->shm_name), config->shm_name);
@@ -596,6 +637,12 @@ ESHMHandle* eshm_init(const ESHMConfig* config) {
         }
     }
     
+    // Start read tracking now rather than at the first read, so a message the
+    // remote writes once it sees us attached (eshm_wait_remote) is not skipped
+    handle->last_read_write_count = handle->actual_role == ESHM_ROLE_MASTER
+        ? handle->shm_data->slave_to_master.write_count
+        : handle->shm_data->master_to_slave.write_count;
+
     // Set role-specific information
     if (handle->actual_role == ESHM_ROLE_MASTER) {
         // Increment generation to signal reconnection to slave
@@ -603,15 +650,15 @@ ESHMHandle* eshm_init(const ESHMConfig* config) {
         handle->shm_data->header.master_generation = old_gen + 1;
 
         handle->shm_data->header.master_pid = getpid();
-        handle->shm_data->header.master_alive = 1;
+        set_alive(&handle->shm_data->header.master_alive);
         handle->shm_data->header.master_heartbeat = 0;
 
         fprintf(stderr, "[ESHM] Master starting with generation %u\n",
                 handle->shm_data->header.master_generation);
     } else {
         handle->shm_data->header.slave_pid = getpid();
-        handle->shm_data->header.slave_alive = 1;
         handle->shm_data->header.slave_heartbeat = 0;
+        set_alive(&handle->shm_data->header.slave_alive);
     }
     
     // Start threads if configured
@@ -679,11 +726,8 @@ int eshm_destroy(ESHMHandle* handle) {
     return ESHM_SUCCESS;
 }
 
-int eshm_write(ESHMHandle* handle, const void* data, size_t size) {
-    if (!handle || !data) {
-        return ESHM_ERROR_INVALID_PARAM;
-    }
-
+// Select the channel this handle writes to
+static int get_write_channel(ESHMHandle* handle, ESHMChannel** channel) {
     // Cache shm_data pointer to avoid race condition with monitor thread
     ESHMData* shm_data_snapshot = handle->shm_data;
 
@@ -697,16 +741,28 @@ int eshm_write(ESHMHandle* handle, const void* data, size_t size) {
         return ESHM_ERROR_NOT_INITIALIZED;
     }
 
-    if (size > ESHM_MAX_DATA_SIZE) {
-        return ESHM_ERROR_BUFFER_TOO_SMALL;
-    }
-
     // Select channel based on role - use cached pointer
-    ESHMChannel* channel;
     if (handle->actual_role == ESHM_ROLE_MASTER) {
-        channel = &shm_data_snapshot->master_to_slave;
+        *channel = &shm_data_snapshot->master_to_slave;
     } else {
-        channel = &shm_data_snapshot->slave_to_master;
+        *channel = &shm_data_snapshot->slave_to_master;
+    }
+    return ESHM_SUCCESS;
+}
+
+int eshm_write(ESHMHandle* handle, const void* data, size_t size) {
+    if (!handle || !data) {
+        return ESHM_ERROR_INVALID_PARAM;
+    }
+
+    ESHMChannel* channel;
+    int ret = get_write_channel(handle, &channel);
+    if (ret != ESHM_SUCCESS) {
+        return ret;
+    }
+
+    if (size > ESHM_MAX_DATA_SIZE) {
+        return ESHM_ERROR_BUFFER_TOO_SMALL;
     }
 
     // Write with sequence lock
@@ -716,10 +772,72 @@ int eshm_write(ESHMHandle* handle, const void* data, size_t size) {
     seqlock_write_end(&channel->seqlock);
 
     __sync_fetch_and_add(&channel->write_count, 1);
+    channel_notify(channel);
+
+    return ESHM_SUCCESS;
+}
+
+int eshm_write_batch(ESHMHandle* handle, const struct iovec* iov, size_t count) {
+    if (!handle || (!iov && count > 0)) {
+        return ESHM_ERROR_INVALID_PARAM;
+    }
+
+    ESHMChannel* channel;
+    int ret = get_write_channel(handle, &channel);
+    if (ret != ESHM_SUCCESS) {
+        return ret;
+    }
+
+    // Check the framed size up front so a batch is never written partially
+    size_t total = 0;
+    for (size_t i = 0; i < count; i++) {
+        if (iov[i].iov_len > ESHM_MAX_DATA_SIZE - sizeof(uint32_t) ||
+            total > ESHM_MAX_DATA_SIZE - sizeof(uint32_t) - iov[i].iov_len) {
+            return ESHM_ERROR_BUFFER_TOO_SMALL;
+        }
+        total += sizeof(uint32_t) + iov[i].iov_len;
+    }
+
+    // All messages go out under one sequence lock and one write_count update
+    seqlock_write_begin(&channel->seqlock);
+    uint8_t* dest = channel->data;
+    for (size_t i = 0; i < count; i++) {
+        uint32_t length = (uint32_t)iov[i].iov_len;
+        memcpy(dest, &length, sizeof(length));
+        memcpy(dest + sizeof(length), iov[i].iov_base, length);
+        dest += sizeof(length) + length;
+    }
+    channel->data_size = total;
+    seqlock_write_end(&channel->seqlock);
+
+    __sync_fetch_and_add(&channel->write_count, 1);
+    channel_notify(channel);
 
     return ESHM_SUCCESS;
 }
 
+bool eshm_batch_next(const void* batch, size_t size, size_t* offset,
+                     const void** message, size_t* message_size) {
+    if (!batch || !offset || !message || !message_size) {
+        return false;
+    }
+
+    uint32_t length;
+    if (*offset > size || size - *offset < sizeof(length)) {
+        return false;
+    }
+    const uint8_t* pos = (const uint8_t*)batch + *offset;
+    memcpy(&length, pos, sizeof(length));
+    if (size - *offset - sizeof(length) < length) {
+        return false;
+    }
+
+    *message = pos + sizeof(length);
+    *message_size = length;
+    *offset += sizeof(length) + length;
+    return true;
+}
+
 int eshm_read_timeout(ESHMHandle* handle, void* buffer, size_t buffer_size,
                       size_t* bytes_read, uint32_t timeout_ms) {
     if (!handle || !buffer) {
@@ -755,12 +873,8 @@ int eshm_read_timeout(ESHMHandle* handle, void* buffer, size_t buffer_size,
 
     uint64_t start_time = get_time_ms();
 
-    // Use persistent tracking across calls instead of resetting each time
-    // This ensures we don't miss messages that arrived between calls
-    if (handle->last_read_write_count == 0) {
-        // First read - initialize to current write count
-        handle->last_read_write_count = channel->write_count;
-    }
+    // last_read_write_count persists across calls (started at attach), so
+    // messages that arrived between calls are not missed
 
     while (true) {
         // Check if SHM was detached during reconnection (recheck handle->shm_data)
@@ -772,7 +886,10 @@ int eshm_read_timeout(ESHMHandle* handle, void* buffer, size_t buffer_size,
             return ESHM_ERROR_NOT_INITIALIZED;
         }
 
-        // Check if new data is available
+        // Check if new data is available (wake_seq first, so a write after
+        // the check is not missed by channel_wait)
+        uint32_t wake_seq = channel->wake_seq;
+        smp_mb();
         uint64_t current_write_count = channel->write_count;
         if (current_write_count > handle->last_read_write_count) {
             // New data available, read with sequence lock
@@ -813,8 +930,12 @@ int eshm_read_timeout(ESHMHandle* handle, void* buffer, size_t buffer_size,
             return ESHM_ERROR_TIMEOUT;
         }
         
-        // Sleep a bit before retrying
-        usleep(100);  // 100us
+        // Block until the writer signals the channel (no yield loop first:
+        // with writer and reader on one CPU each sched_yield hands away a
+        // whole scheduler slice)
+        uint64_t remaining = timeout_ms - elapsed;
+        channel_wait(channel, wake_seq,
+                     remaining < READ_WAIT_SLICE_MS ? (uint32_t)remaining : READ_WAIT_SLICE_MS);
     }
 }
 
@@ -866,6 +987,47 @@ int eshm_check_remote_alive(ESHMHandle* handle, bool* is_alive) {
     return ESHM_SUCCESS;
 }
 
+int eshm_wait_remote(ESHMHandle* handle, uint32_t timeout_ms) {
+    if (!handle) {
+        return ESHM_ERROR_INVALID_PARAM;
+    }
+
+    uint64_t start = get_time_ms();
+    while (true) {
+        // Re-read each time, a reconnecting slave swaps (or detaches) shm_data
+        ESHMData* data = handle->shm_data;
+        volatile uint32_t* flag = NULL;
+        if (data) {
+            flag = handle->actual_role == ESHM_ROLE_MASTER ? &data->header.slave_alive
+                                                           : &data->header.master_alive;
+            if (*flag) {
+                return ESHM_SUCCESS;
+            }
+        }
+
+        uint64_t elapsed = get_time_ms() - start;
+        if (elapsed >= timeout_ms) {
+            return ESHM_ERROR_TIMEOUT;
+        }
+        uint32_t wait_ms = timeout_ms - elapsed;
+        if (wait_ms > ATTACH_WAIT_SLICE_MS) {
+            wait_ms = ATTACH_WAIT_SLICE_MS;
+        }
+
+        if (flag) {
+            struct timespec ts;
+            ts.tv_sec = wait_ms / 1000;
+            ts.tv_nsec = (long)(wait_ms % 1000) * 1000000L;
+            // Shared futex (the remote is another process); returns at once if
+            // the flag is no longer 0
+            if (syscall(SYS_futex, flag, FUTEX_WAIT, 0, &ts, NULL, 0) == 0 || errno != ENOSYS) {
+                continue;
+            }
+        }
+        sleep_ms(wait_ms);
+    }
+}
+
 int eshm_get_stats(ESHMHandle* handle, ESHMStats* stats) {
     if (!handle || !stats) {
         return ESHM_ERROR_INVALID_PARAM;
@@ -1051,3 +1213,13 @@ void eshm_free_value(void* value, uint8_t type) {
     }
     free(value);
 }
+
+// Free all values returned by one eshm_read_data call
+void eshm_free_values(void** values, const uint8_t* types, int count) {
+    if (!values || !types) return;
+
+    for (int i = 0; i < count; i++) {
+        eshm_free_value(values[i], types[i]);
+        values[i] = nullptr;
+    }
+}
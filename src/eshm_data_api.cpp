@@ -92,7 +92,8 @@ int eshm_write_data(ESHMHandle* eshm,
 
 // Read and decode data from ESHM (read + decode in one call)
 // Returns number of items decoded, or negative on error
-int eshm_read_data(ESHMHandle* eshm,
+// (named eshm_data_read so it can live in libeshm.so next to eshm.h's eshm_read_data)
+int eshm_data_read(ESHMHandle* eshm,
                    uint8_t* out_types,        // Output: DataType values
                    char** out_keys,           // Output: String keys (caller provides array of char*)
                    int max_key_len,           // Max length for each key string
@@ -210,4 +211,14 @@ void eshm_data_free_value(uint8_t type, void* value) {
     }
 }
 
+// Free all values returned by one eshm_data_read call
+void eshm_data_free_values(const uint8_t* types, void** values, int count) {
+    if (!types || !values) return;
+
+    for (int i = 0; i < count; i++) {
+        eshm_data_free_value(types[i], values[i]);
+        values[i] = nullptr;
+    }
+}
+
 } // extern "C"
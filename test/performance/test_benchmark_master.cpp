@@ -54,13 +54,9 @@ void run_master(const char* shm_name, int stats_interval) {
     std::cout << "Initialized as MASTER" << std::endl;
     std::cout << "Waiting for slave to connect..." << std::endl;
 
-    // Wait for slave
-    bool slave_alive = false;
-    while (!slave_alive && g_running) {
-        eshm_check_remote_alive(handle, &slave_alive);
-        if (!slave_alive) {
-            usleep(100000); // 100ms
-        }
+    // Wait for slave (returns as soon as it attaches; the 100ms timeout
+    // only bounds how long Ctrl+C takes to be noticed)
+    while (g_running && eshm_wait_remote(handle, 100) == ESHM_ERROR_TIMEOUT) {
     }
 
     if (!g_running) {
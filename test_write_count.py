@@ -24,10 +24,11 @@ def main():
 
     # Try to peek at the write_count by reading the raw SHM
     # This is a hack but helps debug
+    buffer = bytearray(4096)
     for i in range(10):
-        result = eshm.try_read(4096)
-        if result:
-            print(f"  [{i}] Got data: {len(result)} bytes")
+        size = eshm.try_read_into(buffer)
+        if size is not None:
+            print(f"  [{i}] Got data: {size} bytes")
         else:
             print(f"  [{i}] No data")
         time.sleep(0.5)